@@ -0,0 +1,285 @@
+"""
+Mortgage Annuity-Factor Table
+
+An optional precomputed table of annuity factors for high-volume quoting.
+The factor is the monthly payment per unit of principal. The table covers
+a dense grid of APRs for a set of standard terms and is stored in the
+columnar file layout from mortgage_columnar, so a cold start only maps
+the file.
+
+Queries on a grid APR are answered by direct indexing. Other APRs are
+linearly interpolated between the two neighbouring grid points. When the
+table is built, the interpolation error is measured at the midpoint of
+every grid interval, where it peaks for a smooth curve like this one. The
+largest relative error is stored in the file, and a query that asks for a
+tighter tolerance is calculated exactly instead. Terms outside the table
+are always calculated exactly.
+"""
+import math
+import os
+from array import array
+from collections import namedtuple
+
+import mortgage_calculator as mc
+import mortgage_columnar
+
+DEFAULT_TABLE_PATH = 'annuity_factors.mtgcol'
+DEFAULT_APR_STEP = 0.001
+DEFAULT_MAX_APR = 20.0
+STANDARD_TERMS = (60, 84, 120, 180, 240, 300, 360, 480)
+GRID_COLUMNS = (('apr_step', 'd'), ('max_apr', 'd'), ('apr_count', 'q'),
+                ('max_error', 'd'))
+
+
+class TableGrid(namedtuple('TableGrid',
+                           [name for name, _ in GRID_COLUMNS])):
+    """
+    The APR grid of an annuity-factor table, stored in the table file as
+    one single-value column per field.
+
+    Attributes:
+        apr_step (float): Grid spacing in APR percentage points.
+        max_apr (float): The last grid APR.
+        apr_count (int): The number of grid APRs.
+        max_error (float): The largest relative interpolation error.
+    """
+    __slots__ = ()
+
+
+def exact_factor(apr, loan_term_months):
+    """
+    Calculates an annuity factor directly.
+
+    This bypasses the calculator's LRU annuity cache, which building a
+    whole table would otherwise flush.
+
+    Args:
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        float: The payment per unit of principal.
+    """
+    rate = mc.monthly_rate(apr)
+    if rate == 0:
+        return 1 / loan_term_months
+    return mc.annuity_factor(rate, loan_term_months)
+
+
+def tabulate(grid, terms):
+    """
+    Calculates the annuity factor at every grid APR for every term.
+
+    Args:
+        grid (TableGrid): The APR grid.
+        terms (tuple): The terms, in months, to tabulate.
+
+    Returns:
+        array.array: The factors, one row of len(terms) per grid APR.
+    """
+    return array('d', (exact_factor(index * grid.apr_step, months)
+                       for index in range(grid.apr_count)
+                       for months in terms))
+
+
+def interpolation_error(grid, terms, factors):
+    """
+    Measures the largest relative error of interpolating between grid
+    points, at the midpoint of every grid interval.
+
+    Args:
+        grid (TableGrid): The APR grid.
+        terms (tuple): The tabulated terms, in months.
+        factors (array.array): The factors from tabulate().
+
+    Returns:
+        float: The largest relative interpolation error.
+    """
+    width = len(terms)
+    max_error = 0.0
+    for index in range(grid.apr_count - 1):
+        for position, months in enumerate(terms):
+            low = factors[index * width + position]
+            high = factors[(index + 1) * width + position]
+            exact = exact_factor((index + 0.5) * grid.apr_step, months)
+            max_error = max(max_error, abs((low + high) / 2 - exact) / exact)
+    return max_error
+
+
+def build_table(path=DEFAULT_TABLE_PATH,
+                apr_step=DEFAULT_APR_STEP,
+                max_apr=DEFAULT_MAX_APR,
+                terms=STANDARD_TERMS):
+    """
+    Computes the annuity-factor table and writes it to disk.
+
+    Args:
+        path (str, optional): Path of the table file to write.
+        apr_step (float, optional): Grid spacing in APR percentage points.
+        max_apr (float, optional): The highest APR the grid must cover.
+        It is rounded up to the next grid point.
+        terms (tuple, optional): The terms, in months, to tabulate.
+
+    Returns:
+        float: The largest relative interpolation error in the table.
+    """
+    # Round up so the grid reaches max_apr, allowing for float noise in
+    # the division, and record the last grid point actually built.
+    apr_count = math.ceil(max_apr / apr_step - 1e-9) + 1
+    grid = TableGrid(apr_step, (apr_count - 1) * apr_step, apr_count, 0.0)
+    factors = tabulate(grid, terms)
+    grid = grid._replace(max_error=interpolation_error(grid, terms, factors))
+
+    # The table holds no loans, so the header's loan count is zero; the
+    # grid is described by its own columns instead.
+    columns = [(name, typecode, 1) for name, typecode in GRID_COLUMNS]
+    columns += [('terms', 'i', len(terms)), ('factors', 'd', len(factors))]
+    mapping, views = mortgage_columnar.create_columnar_file(
+        path, apr_count, 0, columns)
+    for name, _ in GRID_COLUMNS:
+        views[name][0] = getattr(grid, name)
+    views['terms'][:] = array('i', terms)
+    views['factors'][:] = factors
+    mortgage_columnar.close_columnar_file(mapping, views)
+    return grid.max_error
+
+
+def read_grid(table_file):
+    """
+    Reads the APR grid description of a table file.
+
+    Args:
+        table_file (mortgage_columnar.ColumnarFile): The mapped table.
+
+    Returns:
+        TableGrid: The grid.
+    """
+    values = {}
+    for name, _ in GRID_COLUMNS:
+        column = table_file.column(name)
+        values[name] = column[0]
+        column.release()
+    return TableGrid(**values)
+
+
+class AnnuityTable:
+    """
+    A memory-mapped annuity-factor table.
+
+    Attributes:
+        grid (TableGrid): The APR grid and its interpolation error.
+        term_positions (dict): Column position of each tabulated term.
+        exact_queries (int): Queries answered by exact calculation.
+    """
+
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        self.file = mortgage_columnar.ColumnarFile(path)
+        self.grid = read_grid(self.file)
+
+        terms = self.file.column('terms')
+        self.term_positions = {months: position
+                               for position, months in enumerate(terms)}
+        terms.release()
+
+        self.factors = self.file.column('factors')
+        self.exact_queries = 0
+
+    @classmethod
+    def load_or_build(cls, path=DEFAULT_TABLE_PATH):
+        """
+        Maps a table file, building it first if it does not exist.
+
+        Args:
+            path (str, optional): Path of the table file.
+
+        Returns:
+            AnnuityTable: The mapped table.
+        """
+        if not os.path.exists(path):
+            build_table(path)
+        return cls(path)
+
+    def factor(self, apr, loan_term_months, tolerance=None):
+        """
+        Looks up the annuity factor for an APR and term.
+
+        Args:
+            apr (float): The annual interest rate as a percentage.
+            loan_term_months (int): The length of the loan term in months.
+            tolerance (float, optional): The largest relative error the
+            caller accepts. If the table cannot promise it, the factor is
+            calculated exactly.
+
+        Returns:
+            float: The payment per unit of principal.
+        """
+        apr = float(apr)
+        months = int(loan_term_months)
+        position = self.term_positions.get(months)
+
+        if position is None or not 0 <= apr <= self.grid.max_apr:
+            self.exact_queries += 1
+            return exact_factor(apr, months)
+
+        point = apr / self.grid.apr_step
+        width = len(self.term_positions)
+        nearest = round(point)
+        if abs(point - nearest) < 1e-9:
+            return self.factors[nearest * width + position]
+
+        index = int(point)
+        weight = point - index
+        low = self.factors[index * width + position]
+
+        if tolerance is not None and self.grid.max_error > tolerance:
+            self.exact_queries += 1
+            return exact_factor(apr, months)
+
+        high = self.factors[(index + 1) * width + position]
+        return low + (high - low) * weight
+
+    def monthly_payment(self, loan_amount, apr, loan_term_months,
+                        tolerance=None):
+        """
+        Calculates a monthly payment from the table.
+
+        Args:
+            loan_amount (float): The total amount of the loan.
+            apr (float): The annual interest rate as a percentage.
+            loan_term_months (int): The length of the loan term in months.
+            tolerance (float, optional): The largest relative error the
+            caller accepts.
+
+        Returns:
+            float: The monthly payment amount.
+        """
+        return float(loan_amount) * self.factor(apr, loan_term_months,
+                                                tolerance)
+
+    def monthly_payments(self, loan_amounts, aprs, loan_terms_months):
+        """
+        Calculates monthly payments for a batch of loans from the table.
+
+        Args:
+            loan_amounts (iterable): The loan amounts.
+            aprs (iterable): The annual interest rates as percentages.
+            loan_terms_months (iterable): The loan terms in months.
+
+        Returns:
+            array.array: The monthly payments, in input order.
+        """
+        return array('d', map(self.monthly_payment, loan_amounts, aprs,
+                              loan_terms_months))
+
+    def close(self):
+        """
+        Releases the factor view and unmaps the file.
+        """
+        self.factors.release()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,170 @@
+"""
+Adjustable-Rate Mortgage Engine
+
+Prices adjustable-rate mortgages (ARMs). An ARM holds its initial APR for a
+fixed period, then resets at a regular interval to an index rate plus a
+margin. Each reset is limited by a periodic cap and by lifetime cap and
+floor limits. At every reset the remaining balance is re-amortized over the
+months left in the term.
+
+ARM terms are dictionaries with these keys (see DEFAULT_ARM):
+- 'initial_apr': APR for the fixed period, as a percentage.
+- 'fixed_months': Length of the fixed period in months.
+- 'reset_months': Months between resets after the fixed period.
+- 'margin': Percentage points added to the index rate at each reset.
+- 'periodic_cap': Largest change allowed at a single reset.
+- 'lifetime_cap': Largest rise allowed above the initial APR.
+- 'floor': Lowest APR allowed.
+
+A rate path is a list of (start_month, apr) segments. Because a schedule
+on a given rate path scales linearly with the loan amount, batch pricing
+builds one unit-loan result per distinct term and scales it per loan.
+"""
+from array import array
+
+import mortgage_calculator as mc
+
+DEFAULT_ARM = {
+    'initial_apr': 5.0,
+    'fixed_months': 60,
+    'reset_months': 12,
+    'margin': 2.75,
+    'periodic_cap': 2.0,
+    'lifetime_cap': 5.0,
+    'floor': 0.0,
+}
+
+
+def arm_rate_path(arm, index_path, loan_term_months):
+    """
+    Builds the capped APR segments of an ARM from a path of index rates.
+
+    Args:
+        arm (dict): ARM terms; missing keys come from DEFAULT_ARM.
+        index_path (list): Index rates for each reset, as percentages. The
+        last rate is reused if there are more resets than rates.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        list: (start_month, apr) segments in month order.
+    """
+    arm = {**DEFAULT_ARM, **arm}
+    ceiling = arm['initial_apr'] + arm['lifetime_cap']
+    apr = arm['initial_apr']
+    segments = [(1, apr)]
+
+    start_months = range(arm['fixed_months'] + 1, int(loan_term_months) + 1,
+                         arm['reset_months'])
+    for reset, start_month in enumerate(start_months):
+        if not index_path:
+            break
+        index_rate = index_path[min(reset, len(index_path) - 1)]
+        target = index_rate + arm['margin']
+        target = min(max(target, apr - arm['periodic_cap']),
+                     apr + arm['periodic_cap'])
+        apr = min(max(target, arm['floor']), ceiling)
+        segments.append((start_month, apr))
+
+    return segments
+
+
+def arm_schedule(loan_amount, loan_term_months, rate_path):
+    """
+    Yields the amortization schedule of a loan on a rate path.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        loan_term_months (int): The length of the loan term in months.
+        rate_path (list): (start_month, apr) segments from arm_rate_path().
+
+    Yields:
+        tuple: (month, apr, payment, principal, interest, balance).
+    """
+    balance = float(loan_amount)
+    months = int(loan_term_months)
+    resets = dict(rate_path)
+    apr = rate_path[0][1]
+    rate = mc.monthly_rate(apr)
+    payment = mc.payment_from_monthly_rate(balance, rate, months)
+
+    for month in range(1, months + 1):
+        if month in resets and month > 1:
+            apr = resets[month]
+            rate = mc.monthly_rate(apr)
+            # Reset rates come from simulated index paths and rarely
+            # repeat, so they bypass the annuity-factor cache.
+            payment = mc.payment_from_monthly_rate(balance, rate,
+                                                   months - month + 1,
+                                                   cached=False)
+
+        interest = balance * rate
+        principal = balance if month == months else payment - interest
+        balance -= principal
+        yield (month, apr, principal + interest, principal, interest,
+               balance)
+
+
+def price_arm(loan_amount, loan_term_months, rate_path):
+    """
+    Summarises one ARM on a rate path without keeping its schedule.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        loan_term_months (int): The length of the loan term in months.
+        rate_path (list): (start_month, apr) segments.
+
+    Returns:
+        dict: 'payments' (array.array of the payment in each segment),
+        'total_interest' and 'max_payment'.
+    """
+    resets = {start for start, _ in rate_path}
+    payments = array('d')
+    total_interest = 0.0
+
+    for month, _, payment, _, interest, _ in arm_schedule(
+            loan_amount, loan_term_months, rate_path):
+        if month in resets:
+            payments.append(payment)
+        total_interest += interest
+
+    return {
+        'payments': payments,
+        'total_interest': total_interest,
+        'max_payment': max(payments, default=0.0),
+    }
+
+
+def price_arms(loan_amounts, loan_terms_months, rate_path):
+    """
+    Prices a batch of ARMs that share one rate path.
+
+    The schedule of a unit loan is run once for each distinct term and
+    its results are scaled by every loan amount with that term.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        loan_terms_months (iterable): The loan terms in months.
+        rate_path (list): (start_month, apr) segments shared by all loans.
+
+    Returns:
+        list: One price_arm() summary per loan, in input order.
+    """
+    unit_results = {}
+    results = []
+
+    for loan_amount, loan_term_months in zip(loan_amounts,
+                                             loan_terms_months):
+        months = int(loan_term_months)
+        if months not in unit_results:
+            unit_results[months] = price_arm(1.0, months, rate_path)
+
+        unit = unit_results[months]
+        loan_amount = float(loan_amount)
+        results.append({
+            'payments': array('d', (loan_amount * payment
+                                    for payment in unit['payments'])),
+            'total_interest': loan_amount * unit['total_interest'],
+            'max_payment': loan_amount * unit['max_payment'],
+        })
+
+    return results
@@ -0,0 +1,778 @@
+"""
+Mortgage Batch Pricer
+
+This script prices a whole portfolio of loans without prompting. Loans are
+streamed from a CSV or JSON Lines file, validated with the same rules as the
+interactive mortgage calculator, priced a chunk at a time and written out as
+CSV. With --workers the file is split into byte-range shards that are
+priced in separate processes and merged back in input order.
+
+Input files need the columns (or JSON keys) loan_amount, apr and
+loan_term_months. Files ending in .jsonl or .json are read as JSON Lines,
+files ending in .mtgcol are memory-mapped columnar portfolios (see
+mortgage_columnar), and anything else is read as CSV with a header row.
+Rejected rows can be copied to a JSON Lines quarantine file with
+--quarantine; each line records the row number, its error bitmask, the
+decoded errors and the original record. Use --to-columnar to convert the
+valid loans of a CSV or JSON Lines file into a columnar portfolio.
+
+--stats enables mortgage_calculator.INSTRUMENTATION for the run and writes
+its JSON snapshot, which adds read, write and column validation timings
+to the calculator's own. --profile writes a cProfile profile of the run.
+
+Usage:
+    python mortgage_batch.py LOANS_FILE OUTPUT_CSV [--chunk-size N]
+                             [--workers N] [--shard-bytes N]
+                             [--quarantine REJECTS.jsonl]
+                             [--stats STATS.json] [--profile RUN.prof]
+    python mortgage_batch.py LOANS_FILE PORTFOLIO.mtgcol --to-columnar
+"""
+import argparse
+import csv
+import io
+import json
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from time import perf_counter
+
+import mortgage_calculator as mc
+import mortgage_columnar
+
+LOAN_FIELDS = ('loan_amount', 'apr', 'loan_term_months')
+FIELD_RULES = ((float, False), (float, True), (int, False))
+ERROR_FLAGS = ('error_invalid', 'error_zero', 'error_infinite', 'error_nan',
+               'error_negative')
+OUTPUT_FIELDS = ('row', 'monthly_payment', 'error')
+JSON_LINES_EXTENSIONS = ('.jsonl', '.json')
+COLUMNAR_EXTENSION = '.mtgcol'
+# Fields whose values repeat across a portfolio, so validation memoises
+# them. Amounts are mostly unique and the memo would only slow them down.
+MEMOIZED_FIELDS = ('apr', 'loan_term_months')
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_SHARD_BYTES = 8 * 1024 * 1024
+DEFAULT_SHARDING = {'workers': None, 'shard_bytes': DEFAULT_SHARD_BYTES}
+
+
+def is_json_lines(input_path):
+    """
+    Checks whether a portfolio file should be read as JSON Lines.
+
+    Args:
+        input_path (str): Path to the portfolio file.
+
+    Returns:
+        bool: True for JSON Lines files, False for CSV.
+    """
+    return input_path.lower().endswith(JSON_LINES_EXTENSIONS)
+
+
+def parse_loans(lines, json_lines, fieldnames=None):
+    """
+    Parses loan records from an iterable of text lines.
+
+    Args:
+        lines (iterable): The lines to parse.
+        json_lines (bool): True to parse JSON Lines, False for CSV.
+        fieldnames (list, optional): CSV column names. If omitted, the
+        first line is read as the header.
+
+    Yields:
+        dict: One loan record per row, keyed by column name. A JSON Lines
+        row that cannot be decoded is yielded as its raw text, so it can
+        be rejected and quarantined without stopping the stream.
+    """
+    if json_lines:
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield line.rstrip('\r\n')
+    else:
+        yield from csv.DictReader(lines, fieldnames)
+
+
+def read_loans(input_path):
+    """
+    Streams loan records from a CSV or JSON Lines file.
+
+    Args:
+        input_path (str): Path to the portfolio file.
+
+    Yields:
+        dict: One loan record per row, keyed by column name.
+    """
+    with open(input_path, encoding='utf-8', newline='') as loans_file:
+        yield from parse_loans(loans_file, is_json_lines(input_path))
+
+
+def read_chunk(loans, chunk_size):
+    """
+    Reads the next chunk of loan records from a stream.
+
+    Args:
+        loans (iterator): The loan records.
+        chunk_size (int): The most records to read.
+
+    Returns:
+        list: The records read; empty when the stream is exhausted.
+    """
+    start = perf_counter() if mc.INSTRUMENTATION.enabled else None
+    chunk = list(islice(loans, chunk_size))
+    if start is not None:
+        mc.INSTRUMENTATION.record('read', start, len(chunk))
+    return chunk
+
+
+def write_rows(writer, rows):
+    """
+    Writes output rows to the CSV writer.
+
+    Args:
+        writer (csv.writer): The output writer.
+        rows (list): The rows to write.
+    """
+    start = perf_counter() if mc.INSTRUMENTATION.enabled else None
+    writer.writerows(rows)
+    if start is not None:
+        mc.INSTRUMENTATION.record('write', start, len(rows))
+
+
+def loan_field(loan, field):
+    """
+    Reads one field of a loan record.
+
+    Args:
+        loan: The loan record. Anything other than a dict, such as an
+        undecodable or non-object JSON Lines row, has no fields.
+        field (str): The column name.
+
+    Returns:
+        The field's value, or None if it is missing.
+    """
+    return loan.get(field) if isinstance(loan, dict) else None
+
+
+def validate_loan(loan):
+    """
+    Validates one loan record using the interactive calculator's rules.
+
+    Args:
+        loan (dict): The loan record.
+
+    Returns:
+        str: The MESSAGES key of the first error found, or None if the
+        loan is valid.
+    """
+    return (mc.input_error(loan_field(loan, 'loan_amount'), float)
+            or mc.input_error(loan_field(loan, 'apr'), float, True)
+            or mc.input_error(loan_field(loan, 'loan_term_months'), int))
+
+
+def error_bit(field_index, error):
+    """
+    Finds the bitmask flag for one field failing one validation rule.
+
+    Each field owns a block of len(ERROR_FLAGS) bits, in LOAN_FIELDS order.
+
+    Args:
+        field_index (int): The field's position in LOAN_FIELDS.
+        error (str): The MESSAGES key of the error.
+
+    Returns:
+        int: The flag.
+    """
+    return 1 << (field_index * len(ERROR_FLAGS) + ERROR_FLAGS.index(error))
+
+
+def describe_mask(mask):
+    """
+    Decodes an error bitmask.
+
+    Args:
+        mask (int): A bitmask from validate_columns().
+
+    Returns:
+        list: (field, error) pairs for every flag set, in field order.
+    """
+    return [(field, error)
+            for field_index, field in enumerate(LOAN_FIELDS)
+            for error in ERROR_FLAGS
+            if mask & error_bit(field_index, error)]
+
+
+def validate_column(column, rule, field_bit, masks, memoize=False):
+    """
+    Validates one column of loan values, flagging failures in the masks.
+
+    With memoize, repeated values are checked once and the result reused.
+
+    Args:
+        column (sequence): The values to validate.
+        rule (tuple): (type_constructor, allow_zero) from FIELD_RULES.
+        field_bit (callable): Maps a MESSAGES key to the column's flag.
+        masks (array.array): The row bitmasks, updated in place.
+        memoize (bool, optional): True for columns whose values repeat.
+
+    Returns:
+        dict: A count of each error, keyed by MESSAGES key.
+    """
+    errors = dict.fromkeys(ERROR_FLAGS, 0)
+    checked = {}
+
+    for row, value in enumerate(column):
+        # Keyed by type as well, since True == 1 but only 1 is a
+        # valid term.
+        key = (type(value), value)
+        cacheable = memoize and isinstance(value, (str, int, float))
+        if cacheable and key in checked:
+            error = checked[key]
+        else:
+            error = mc.input_error(value, *rule)
+            if cacheable:
+                checked[key] = error
+
+        if error:
+            masks[row] |= field_bit(error)
+            errors[error] += 1
+
+    return errors
+
+
+def validate_columns(columns):
+    """
+    Validates whole columns of loan values without printing anything.
+
+    Each column is checked in one pass by validate_column(), memoising
+    the MEMOIZED_FIELDS columns.
+
+    Args:
+        columns (tuple): (loan_amounts, aprs, loan_terms_months) sequences
+        of equal length.
+
+    Returns:
+        tuple: (masks, summary). masks is an array.array holding one error
+        bitmask per row, 0 for valid rows. summary holds the 'rows',
+        'valid' and 'rejected' counts, and 'errors', a count of each error
+        keyed by field and then by MESSAGES key.
+    """
+    start = perf_counter() if mc.INSTRUMENTATION.enabled else None
+    row_count = len(columns[0])
+    masks = array('L', [0]) * row_count
+    errors = {
+        field: validate_column(column, rule,
+                               partial(error_bit, field_index), masks,
+                               field in MEMOIZED_FIELDS)
+        for field_index, (field, column, rule)
+        in enumerate(zip(LOAN_FIELDS, columns, FIELD_RULES))
+    }
+
+    rejected = sum(1 for mask in masks if mask)
+    summary = {
+        'rows': row_count,
+        'valid': row_count - rejected,
+        'rejected': rejected,
+        'errors': errors,
+    }
+    if start is not None:
+        mc.INSTRUMENTATION.record('column_validation', start,
+                                  row_count * len(columns))
+    return masks, summary
+
+
+def quarantine_record(row, mask, loan):
+    """
+    Builds the quarantine file line for a rejected row.
+
+    Args:
+        row (int): The 1-based row number.
+        mask (int): The row's error bitmask.
+        loan (dict): The original loan record.
+
+    Returns:
+        str: One JSON line, including its newline.
+    """
+    return json.dumps({
+        'row': row,
+        'mask': mask,
+        'errors': [f'{field}:{error}' for field, error in describe_mask(mask)],
+        'loan': loan,
+    }, default=str) + '\n'
+
+
+def price_chunk(loans, first_row):
+    """
+    Validates and prices one chunk of loans in a single batch call.
+
+    Args:
+        loans (list): The loan records in this chunk.
+        first_row (int): The 1-based row number of the first loan.
+
+    Returns:
+        tuple: (rows, rejects, summary). rows are (row, monthly_payment,
+        error) in input order, where error is the first error's MESSAGES
+        key. rejects are (row, mask, loan) for every rejected loan.
+        summary is the validate_columns() summary.
+    """
+    columns = tuple([loan_field(loan, field) for loan in loans]
+                    for field in LOAN_FIELDS)
+    masks, summary = validate_columns(columns)
+    valid_columns = [[value for value, mask in zip(column, masks)
+                      if not mask] for column in columns]
+    payments = iter(mc.calculate_monthly_payments(*valid_columns))
+
+    rows = []
+    rejects = []
+    for row, (loan, mask) in enumerate(zip(loans, masks), first_row):
+        if mask:
+            rows.append((row, '', describe_mask(mask)[0][1]))
+            rejects.append((row, mask, loan))
+        else:
+            rows.append((row, f'{next(payments):.2f}', ''))
+
+    return rows, rejects, summary
+
+
+def price_stream(loans, chunk_size):
+    """
+    Validates and prices a stream of loans a chunk at a time.
+
+    Args:
+        loans (iterator): The loan records.
+        chunk_size (int): Loans priced per batch call.
+
+    Yields:
+        tuple: The price_chunk() result for each chunk, with rows
+        numbered from 1 across the whole stream.
+    """
+    first_row = 1
+    chunk = read_chunk(loans, chunk_size)
+    while chunk:
+        yield price_chunk(chunk, first_row)
+        first_row += len(chunk)
+        chunk = read_chunk(loans, chunk_size)
+
+
+def new_summary():
+    """
+    Builds an empty batch summary for accumulating chunk results.
+
+    Returns:
+        dict: Zeroed 'priced' and 'rejected' counts and error counts.
+    """
+    return {
+        'priced': 0,
+        'rejected': 0,
+        'errors': {field: dict.fromkeys(ERROR_FLAGS, 0)
+                   for field in LOAN_FIELDS},
+    }
+
+
+def add_to_summary(summary, priced, rejected, errors):
+    """
+    Adds one chunk's or shard's counts into a batch summary.
+
+    Args:
+        summary (dict): The batch summary from new_summary().
+        priced (int): Loans priced.
+        rejected (int): Loans rejected.
+        errors (dict): Error counts keyed by field and MESSAGES key.
+    """
+    summary['priced'] += priced
+    summary['rejected'] += rejected
+    for field, counts in errors.items():
+        for error, count in counts.items():
+            summary['errors'][field][error] += count
+
+
+def open_quarantine(quarantine_path):
+    """
+    Opens the quarantine file, or a null device when none is wanted.
+
+    Args:
+        quarantine_path (str): Path of the quarantine file, or None.
+
+    Returns:
+        file: A writable text file.
+    """
+    return open(quarantine_path or os.devnull, 'w', encoding='utf-8')
+
+
+def price_file(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE,
+               quarantine_path=None):
+    """
+    Prices every loan in a portfolio file and writes the payments as CSV.
+
+    Loans are read, validated and priced chunk_size rows at a time, so
+    memory use does not grow with the size of the file. Rejected rows do
+    not stop the stream.
+
+    Args:
+        input_path (str): Path to the CSV or JSON Lines portfolio.
+        output_path (str): Path of the CSV file to write.
+        chunk_size (int, optional): Loans priced per batch call.
+        quarantine_path (str, optional): Path of a JSON Lines file to
+        receive rejected rows.
+
+    Returns:
+        dict: Counts of 'priced' and 'rejected' loans, and 'errors'
+        counted by field and MESSAGES key.
+    """
+    summary = new_summary()
+
+    with open(output_path, 'w', encoding='utf-8', newline='') as output, \
+            open_quarantine(quarantine_path) as quarantine:
+        writer = csv.writer(output)
+        writer.writerow(OUTPUT_FIELDS)
+
+        for rows, rejects, chunk_summary in price_stream(
+                read_loans(input_path), chunk_size):
+            write_rows(writer, rows)
+            quarantine.writelines(quarantine_record(*reject)
+                                  for reject in rejects)
+            add_to_summary(summary, chunk_summary['valid'],
+                           chunk_summary['rejected'], chunk_summary['errors'])
+
+    return summary
+
+
+def price_columnar_file(input_path, output_path,
+                        chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Prices a memory-mapped columnar portfolio and writes the payments as CSV.
+
+    The loan columns are sliced straight out of the mapped file and handed
+    to the batch pricer, so the portfolio is never loaded into lists.
+    Loans in a columnar portfolio were validated when it was written.
+
+    Args:
+        input_path (str): Path to the columnar portfolio.
+        output_path (str): Path of the CSV file to write.
+        chunk_size (int, optional): Loans priced per batch call.
+
+    Returns:
+        dict: Counts of 'priced' and 'rejected' loans.
+    """
+    with mortgage_columnar.ColumnarFile(input_path) as portfolio, \
+            open(output_path, 'w', encoding='utf-8', newline='') as output:
+        writer = csv.writer(output)
+        writer.writerow(OUTPUT_FIELDS)
+        columns = portfolio.portfolio_views()
+
+        for start in range(0, portfolio.loan_count, chunk_size):
+            chunk = [column[start:start + chunk_size] for column in columns]
+            payments = mc.calculate_monthly_payments(*chunk)
+            write_rows(writer, [(row, f'{payment:.2f}', '')
+                                for row, payment in enumerate(payments,
+                                                              start + 1)])
+            for view in chunk:
+                view.release()
+
+        for column in columns:
+            column.release()
+
+        return {'priced': portfolio.loan_count, 'rejected': 0}
+
+
+def convert_to_columnar(input_path, output_path):
+    """
+    Writes the valid loans of a CSV or JSON Lines file as a columnar
+    portfolio.
+
+    Args:
+        input_path (str): Path to the CSV or JSON Lines portfolio.
+        output_path (str): Path of the columnar portfolio to write.
+
+    Returns:
+        dict: Counts of 'converted' and 'rejected' loans.
+    """
+    amounts, aprs, terms = array('d'), array('d'), array('l')
+    rejected = 0
+
+    for loan in read_loans(input_path):
+        if validate_loan(loan):
+            rejected += 1
+            continue
+        amounts.append(float(loan['loan_amount']))
+        aprs.append(float(loan['apr']))
+        terms.append(int(loan['loan_term_months']))
+
+    converted = mortgage_columnar.write_portfolio(output_path, amounts,
+                                                  aprs, terms)
+    return {'converted': converted, 'rejected': rejected}
+
+
+def read_header(input_path):
+    """
+    Reads the CSV header and finds where the data rows begin.
+
+    Args:
+        input_path (str): Path to the portfolio file.
+
+    Returns:
+        tuple: (fieldnames, data_offset). fieldnames is None and
+        data_offset is 0 for JSON Lines files.
+    """
+    if is_json_lines(input_path):
+        return None, 0
+
+    with open(input_path, 'rb') as loans_file:
+        header = loans_file.readline()
+
+    fieldnames = next(csv.reader([header.decode('utf-8')]), [])
+    return fieldnames, len(header)
+
+
+def shard_ranges(input_path, data_offset, shard_bytes):
+    """
+    Splits a portfolio file into byte ranges that start and end on
+    record boundaries.
+
+    A CSV shard is extended line by line while it holds an odd number of
+    quote characters, so a quoted field spanning several lines is never
+    cut in two.
+
+    Args:
+        input_path (str): Path to the portfolio file.
+        data_offset (int): Byte offset of the first data row.
+        shard_bytes (int): Approximate size of each shard in bytes.
+
+    Returns:
+        list: (start, end) byte offsets, in file order.
+
+    Raises:
+        ValueError: If shard_bytes is not positive.
+    """
+    if shard_bytes <= 0:
+        raise ValueError(f'shard_bytes must be positive: {shard_bytes}')
+
+    quoted = not is_json_lines(input_path)
+    file_size = os.path.getsize(input_path)
+    ranges = []
+    start = data_offset
+
+    with open(input_path, 'rb') as loans_file:
+        while start < file_size:
+            loans_file.seek(start)
+            quotes = loans_file.read(shard_bytes).count(b'"')
+            line = loans_file.readline()
+            quotes += line.count(b'"')
+            while quoted and quotes % 2 and line:
+                line = loans_file.readline()
+                quotes += line.count(b'"')
+            end = loans_file.tell()
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def price_shard(input_path, start, end, fieldnames, chunk_size):
+    """
+    Prices the loans in one byte range of a portfolio file.
+
+    This runs inside a worker process, so it re-opens the file itself and
+    returns rows without their row numbers; the parent numbers them when
+    it merges the shards.
+
+    Args:
+        input_path (str): Path to the portfolio file.
+        start (int): Byte offset where the shard begins.
+        end (int): Byte offset where the shard ends.
+        fieldnames (list): CSV column names, or None for JSON Lines.
+        chunk_size (int): Loans priced per batch call.
+
+    Returns:
+        tuple: (results, rejects, summary). results are (monthly_payment,
+        error) pairs in input order, rejects are (row, mask, loan) with
+        rows counted from 1 within the shard, and summary accumulates the
+        shard's validation counts.
+    """
+    with open(input_path, 'rb') as loans_file:
+        loans_file.seek(start)
+        text = loans_file.read(end - start).decode('utf-8')
+
+    loans = parse_loans(io.StringIO(text, newline=''),
+                        is_json_lines(input_path), fieldnames)
+    results = []
+    rejects = []
+    summary = new_summary()
+
+    for rows, chunk_rejects, chunk_summary in price_stream(loans, chunk_size):
+        results.extend(row[1:] for row in rows)
+        rejects.extend(chunk_rejects)
+        add_to_summary(summary, chunk_summary['valid'],
+                       chunk_summary['rejected'], chunk_summary['errors'])
+
+    return results, rejects, summary
+
+
+def shard_arguments(input_path, sharding, chunk_size):
+    """
+    Builds the per-shard argument columns for mapping price_shard() over a
+    process pool.
+
+    Args:
+        input_path (str): Path to the CSV or JSON Lines portfolio.
+        sharding (dict): Sharding options, with DEFAULT_SHARDING applied.
+        chunk_size (int): Loans priced per batch call.
+
+    Returns:
+        list: One sequence per price_shard() argument, each holding one
+        value per shard.
+    """
+    fieldnames, data_offset = read_header(input_path)
+    ranges = shard_ranges(input_path, data_offset, sharding['shard_bytes'])
+    return [[input_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [fieldnames] * len(ranges),
+            [chunk_size] * len(ranges)]
+
+
+def merge_shards(shards, writer, quarantine):
+    """
+    Writes priced shards out in file order, numbering their rows.
+
+    Args:
+        shards (iterable): price_shard() results, in file order.
+        writer (csv.writer): The output writer.
+        quarantine (file): The quarantine file for rejected rows.
+
+    Returns:
+        dict: Counts of 'priced' and 'rejected' loans, and 'errors'
+        counted by field and MESSAGES key.
+    """
+    summary = new_summary()
+    row = 0
+
+    for results, rejects, shard_summary in shards:
+        quarantine.writelines(
+            quarantine_record(row + shard_row, mask, loan)
+            for shard_row, mask, loan in rejects)
+        write_rows(writer, [(output_row, payment, error)
+                            for output_row, (payment, error)
+                            in enumerate(results, row + 1)])
+        row += len(results)
+        add_to_summary(summary, shard_summary['priced'],
+                       shard_summary['rejected'], shard_summary['errors'])
+
+    return summary
+
+
+def price_file_parallel(input_path, output_path, sharding=None,
+                        chunk_size=DEFAULT_CHUNK_SIZE,
+                        quarantine_path=None):
+    """
+    Prices a portfolio file across a pool of worker processes.
+
+    The file is cut into shards of about sharding['shard_bytes'] each.
+    Shards are priced concurrently and written out in file order, so the
+    output matches price_file() row for row.
+
+    Args:
+        input_path (str): Path to the CSV or JSON Lines portfolio.
+        output_path (str): Path of the CSV file to write.
+        sharding (dict, optional): 'workers', the number of worker
+        processes (None for the number of CPUs), and 'shard_bytes', the
+        approximate bytes per shard. Missing keys come from
+        DEFAULT_SHARDING.
+        chunk_size (int, optional): Loans priced per batch call.
+        quarantine_path (str, optional): Path of a JSON Lines file to
+        receive rejected rows.
+
+    Returns:
+        dict: Counts of 'priced' and 'rejected' loans, and 'errors'
+        counted by field and MESSAGES key.
+    """
+    sharding = {**DEFAULT_SHARDING, **(sharding or {})}
+    arguments = shard_arguments(input_path, sharding, chunk_size)
+
+    with ProcessPoolExecutor(sharding['workers']) as executor, \
+            open(output_path, 'w', encoding='utf-8', newline='') as output, \
+            open_quarantine(quarantine_path) as quarantine:
+        writer = csv.writer(output)
+        writer.writerow(OUTPUT_FIELDS)
+        return merge_shards(executor.map(price_shard, *arguments), writer,
+                            quarantine)
+
+
+def positive_int(text):
+    """
+    Parses a command-line count that must be at least 1.
+
+    Args:
+        text (str): The argument as typed.
+
+    Returns:
+        int: The parsed value.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive integer.
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f'must be a positive integer: {text}')
+    return value
+
+
+def main():
+    """
+    Parses the command line and prices the requested portfolio file.
+    """
+    parser = argparse.ArgumentParser(
+        description='Price a portfolio of loans from a CSV or JSONL file.')
+    parser.add_argument('input_path')
+    parser.add_argument('output_path')
+    parser.add_argument('--chunk-size', type=positive_int,
+                        default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=positive_int, default=None)
+    parser.add_argument('--shard-bytes', type=positive_int,
+                        default=DEFAULT_SHARD_BYTES)
+    parser.add_argument('--quarantine', default=None)
+    parser.add_argument('--to-columnar', action='store_true')
+    parser.add_argument('--stats', default=None)
+    parser.add_argument('--profile', default=None)
+    args = parser.parse_args()
+
+    message = 'batch_summary'
+    if args.to_columnar:
+        function = convert_to_columnar
+        arguments = (args.input_path, args.output_path)
+        message = 'conversion_summary'
+    elif args.input_path.lower().endswith(COLUMNAR_EXTENSION):
+        function = price_columnar_file
+        arguments = (args.input_path, args.output_path, args.chunk_size)
+    elif args.workers is None:
+        function = price_file
+        arguments = (args.input_path, args.output_path, args.chunk_size,
+                     args.quarantine)
+    else:
+        function = price_file_parallel
+        arguments = (args.input_path, args.output_path,
+                     {'workers': args.workers,
+                      'shard_bytes': args.shard_bytes},
+                     args.chunk_size, args.quarantine)
+
+    if args.stats:
+        mc.INSTRUMENTATION.enable()
+
+    if args.profile:
+        summary = mc.run_profiled(args.profile, function, *arguments)
+    else:
+        summary = function(*arguments)
+
+    if args.stats:
+        mc.INSTRUMENTATION.write_snapshot(args.stats)
+
+    mc.prompt(mc.MESSAGES[message].format(**summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Mortgage Benchmarks
+
+A reproducible benchmark suite for the mortgage calculator's hot paths.
+It covers scalar pricing, batch pricing at several portfolio sizes,
+schedule generation, validation throughput and the console loop. Every
+benchmark runs on a seeded synthetic portfolio, so two runs with the same
+settings do the same work.
+
+Each benchmark reports operations per second from the best of several
+timed runs. It also reports peak traced memory from one extra run under
+tracemalloc, which is kept out of the timings. Results are written as
+JSON, and a previous results file can be passed with --compare to print
+the speed ratio of each benchmark.
+
+Usage:
+    python mortgage_benchmarks.py [--output RESULTS.json]
+                                  [--sizes N [N ...]] [--repeats N]
+                                  [--seed N] [--compare BASELINE.json]
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import time
+import tracemalloc
+from collections import deque
+
+import mortgage_batch
+import mortgage_calculator as mc
+from mortgage_decimal import synthetic_portfolio
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_REPEATS = 3
+DEFAULT_SEED = 101
+DEFAULT_OUTPUT = 'benchmark_results.json'
+SCHEDULE_LOANS = 100
+SESSION_QUOTES = 1000
+INVALID_SHARE = 0.1
+INVALID_VALUES = ('abc', '0', '-5', 'nan', 'inf', '')
+
+
+def synthetic_raw_values(value_count, seed=DEFAULT_SEED):
+    """
+    Generates input strings with a share of invalid values for validation
+    benchmarks.
+
+    Args:
+        value_count (int): Number of values to generate.
+        seed (int, optional): Seed for the random generator.
+
+    Returns:
+        list: The values as strings.
+    """
+    rng = random.Random(seed)
+    return [rng.choice(INVALID_VALUES) if rng.random() < INVALID_SHARE
+            else f'{rng.uniform(1, 900000):.2f}'
+            for _ in range(value_count)]
+
+
+def synthetic_raw_columns(loan_count, seed=DEFAULT_SEED):
+    """
+    Generates a synthetic portfolio with a share of invalid values in each
+    column, for column validation benchmarks.
+
+    Args:
+        loan_count (int): Number of loans to generate.
+        seed (int, optional): Seed for the random generator.
+
+    Returns:
+        tuple: (loan_amounts, aprs, loan_terms_months) as lists of strings.
+    """
+    rng = random.Random(seed)
+    columns = synthetic_portfolio(loan_count, seed)
+    for column in columns:
+        for row in range(loan_count):
+            if rng.random() < INVALID_SHARE:
+                column[row] = rng.choice(INVALID_VALUES)
+    return columns
+
+
+def scalar_pricing(columns):
+    """
+    Prices every loan with calculate_monthly_payment(), one at a time.
+    """
+    for values in zip(*columns):
+        mc.calculate_monthly_payment(*values)
+
+
+def batch_pricing(columns):
+    """
+    Prices every loan in one calculate_monthly_payments() call.
+    """
+    mc.calculate_monthly_payments(*columns)
+
+
+def schedule_generation(columns):
+    """
+    Runs the full amortization schedule of every loan.
+    """
+    for values in zip(*columns):
+        deque(mc.amortization_schedule(*values), maxlen=0)
+
+
+def scalar_validation(values):
+    """
+    Validates values one at a time with input_error().
+    """
+    for value in values:
+        mc.input_error(value, float)
+
+
+def column_validation(columns):
+    """
+    Validates the loan columns with validate_columns().
+    """
+    mortgage_batch.validate_columns(columns)
+
+
+def session_script(columns):
+    """
+    Builds the console input for one session quoting every loan.
+
+    Args:
+        columns (tuple): (loan_amounts, aprs, loan_terms_months).
+
+    Returns:
+        str: The answers, one per line.
+    """
+    answers = []
+    for values in zip(*columns):
+        answers.extend(values)
+        answers.append('yes')
+    answers[-1] = 'no'
+    return '\n'.join(answers) + '\n'
+
+
+def console_session(script):
+    """
+    Runs the console loop from a scripted input stream.
+    """
+    mc.run_scripted_session(io.StringIO(script))
+
+
+def build_suite(sizes, seed):
+    """
+    Lists the benchmarks to run.
+
+    Args:
+        sizes (list): Portfolio sizes for the size-dependent benchmarks.
+        seed (int): Seed for the synthetic data.
+
+    Returns:
+        list: (name, function, argument, operations) for each benchmark.
+    """
+    suite = []
+    for size in sizes:
+        columns = synthetic_portfolio(size, seed)
+        values = synthetic_raw_values(size, seed)
+        suite += [
+            (f'scalar_pricing[{size}]', scalar_pricing, columns, size),
+            (f'batch_pricing[{size}]', batch_pricing, columns, size),
+            (f'scalar_validation[{size}]', scalar_validation, values, size),
+            (f'column_validation[{size}]', column_validation,
+             synthetic_raw_columns(size, seed), size * 3),
+        ]
+
+    schedule_columns = synthetic_portfolio(SCHEDULE_LOANS, seed)
+    schedule_rows = sum(int(term) for term in schedule_columns[2])
+    suite.append((f'schedule_generation[{SCHEDULE_LOANS}]',
+                  schedule_generation, schedule_columns, schedule_rows))
+
+    script = session_script(synthetic_portfolio(SESSION_QUOTES, seed))
+    suite.append((f'console_session[{SESSION_QUOTES}]', console_session,
+                  script, SESSION_QUOTES))
+    return suite
+
+
+def run_benchmark(function, argument, operations, repeats):
+    """
+    Times one benchmark and measures its peak memory.
+
+    The annuity-factor cache is cleared before every run so each run
+    starts cold.
+
+    Args:
+        function (callable): The benchmark body.
+        argument: The single argument passed to function.
+        operations (int): Operations performed by one call.
+        repeats (int): Timed runs; the fastest is reported.
+
+    Returns:
+        dict: 'operations', 'best_seconds', 'ops_per_sec' and
+        'peak_bytes'.
+    """
+    timings = []
+    for _ in range(repeats):
+        mc.ANNUITY_CACHE.clear()
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+
+    mc.ANNUITY_CACHE.clear()
+    tracemalloc.start()
+    function(argument)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        'operations': operations,
+        'best_seconds': best,
+        'ops_per_sec': operations / best if best else float('inf'),
+        'peak_bytes': peak_bytes,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, repeats=DEFAULT_REPEATS,
+              seed=DEFAULT_SEED):
+    """
+    Runs every benchmark in the suite.
+
+    Args:
+        sizes (list, optional): Portfolio sizes to benchmark.
+        repeats (int, optional): Timed runs per benchmark.
+        seed (int, optional): Seed for the synthetic data.
+
+    Returns:
+        dict: Run settings and environment, plus 'results' keyed by
+        benchmark name.
+    """
+    results = {}
+    for name, function, argument, operations in build_suite(sizes, seed):
+        results[name] = run_benchmark(function, argument, operations,
+                                      repeats)
+        mc.prompt(f"{name}: {results[name]['ops_per_sec']:,.0f} ops/sec")
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': list(sizes),
+        'repeats': repeats,
+        'seed': seed,
+        'results': results,
+    }
+
+
+def compare_results(baseline, current):
+    """
+    Compares two result sets benchmark by benchmark.
+
+    Args:
+        baseline (dict): Results from an earlier run_suite() call.
+        current (dict): Results from this run.
+
+    Returns:
+        dict: current / baseline ops/sec ratio for each benchmark in both.
+    """
+    return {name: (result['ops_per_sec']
+                   / baseline['results'][name]['ops_per_sec'])
+            for name, result in current['results'].items()
+            if name in baseline['results']}
+
+
+def main():
+    """
+    Parses the command line, runs the suite and writes the results.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the mortgage calculator hot paths.')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--compare', default=None)
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.repeats, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        for name, ratio in compare_results(baseline, report).items():
+            mc.prompt(f'{name}: {ratio:.2f}x baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,14 +4,32 @@ Mortgage Calculator
 This script allows users to calculate monthly mortgage payments based on
 user-provided loan amount, annual percentage rate (APR),
 and loan term in months.
+
+Pricing, validation, schedule generation and console input can be timed
+and counted by enabling INSTRUMENTATION; it is off by default and costs
+one flag check per call while off.
 """
 import os
+import sys
 import math
 import json
+import cProfile
+from array import array
+from collections import OrderedDict
+from itertools import repeat
+from operator import mul, sub
+from time import perf_counter
+
+MESSAGES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'mortgage_calculator_messages.json')
 
-with open('mortgage_calculator_messages.json', encoding="utf-8") as file:
+with open(MESSAGES_PATH, encoding="utf-8") as file:
     MESSAGES = json.load(file)
 
+ANNUITY_CACHE_SIZE = 4096
+# The longest accepted term; it fits the int32 columns terms are stored in.
+MAX_TERM_MONTHS = 1200
+
 
 def prompt(display_message):
     """
@@ -34,7 +52,11 @@ def get_user_input(prompt_message):
         str: The user's input.
     """
     prompt(prompt_message)
-    return input()
+    start = perf_counter() if INSTRUMENTATION.enabled else None
+    user_input = input()
+    if start is not None:
+        INSTRUMENTATION.record('input', start)
+    return user_input
 
 
 def get_loan_amount():
@@ -113,28 +135,88 @@ def invalid_input(user_input, type_constructor, allow_zero=False):
     Returns:
         bool: True if the input is invalid, otherwise False.
     """
+    error = input_error(user_input, type_constructor, allow_zero)
+
+    if error is None:
+        return False
+
+    if error != 'error_invalid':
+        print(MESSAGES[error])
+    return True
+
+
+def input_error(user_input, type_constructor, allow_zero=False):
+    """
+    Works out why a value fails validation, without printing anything.
+
+    This holds the validation rules shared by the interactive prompts and
+    the non-interactive batch mode.
+
+    Args:
+        user_input (str): The value to validate.
+        type_constructor (type): The type to which the value
+        should be converted.
+        allow_zero (bool, optional): Whether zero is permitted
+        as valid input. Defaults to False.
+
+    Returns:
+        str: The MESSAGES key describing the error, or None if the
+        value is valid.
+    """
+    start = perf_counter() if INSTRUMENTATION.enabled else None
+    error = None
+
     try:
-        value = type_constructor(user_input)
-    except ValueError:
-        return True
+        value = convert_input(user_input, type_constructor)
+    except (ValueError, TypeError, OverflowError):
+        error = 'error_invalid'
+    else:
+        if not allow_zero and value == 0:
+            error = 'error_zero'
+        elif math.isinf(value):
+            error = 'error_infinite'
+        elif math.isnan(value):
+            error = 'error_nan'
+        elif value < 0:
+            error = 'error_negative'
+
+    if start is not None:
+        INSTRUMENTATION.record('validation', start)
+    return error
 
-    if not allow_zero and value == 0:
-        print(MESSAGES['error_zero'])
-        return True
 
-    if math.isinf(value):
-        print(MESSAGES['error_infinite'])
-        return True
+def convert_input(user_input, type_constructor):
+    """
+    Converts a value to the type a validation rule expects.
 
-    if math.isnan(value):
-        print(MESSAGES['error_nan'])
-        return True
+    Values decoded from JSON arrive as numbers rather than strings, so an
+    integer rule rejects booleans and floats with a fractional part
+    instead of letting int() truncate them. Integers are loan terms, so
+    they may not exceed MAX_TERM_MONTHS.
 
-    if value < 0:
-        print(MESSAGES['error_negative'])
-        return True
+    Args:
+        user_input: The value to convert.
+        type_constructor (type): The type to convert to.
 
-    return False
+    Returns:
+        The converted value.
+
+    Raises:
+        ValueError: If the value does not represent the type.
+        TypeError: If the value cannot be converted at all.
+        OverflowError: If the value is too large for the type, or an
+        integer above MAX_TERM_MONTHS.
+    """
+    if type_constructor is int and (
+            isinstance(user_input, bool)
+            or (isinstance(user_input, float)
+                and not user_input.is_integer())):
+        raise ValueError(user_input)
+
+    value = type_constructor(user_input)
+    if type_constructor is int and value > MAX_TERM_MONTHS:
+        raise OverflowError(user_input)
+    return value
 
 
 def calculate_monthly_payment(loan_amount,
@@ -153,16 +235,616 @@ def calculate_monthly_payment(loan_amount,
     Returns:
         float: The monthly payment amount.
     """
-    annual_interest_rate = float(apr) / 100
-    monthly_interest_rate = annual_interest_rate / 12
+    start = perf_counter() if INSTRUMENTATION.enabled else None
+    payment = payment_from_monthly_rate(float(loan_amount),
+                                        monthly_rate(apr),
+                                        int(loan_term_months))
+    if start is not None:
+        INSTRUMENTATION.record('pricing', start)
+    return payment
+
+
+def monthly_rate(apr):
+    """
+    Converts an APR percentage into a monthly interest rate.
+
+    Args:
+        apr (float): The annual interest rate as a percentage.
+
+    Returns:
+        float: The monthly interest rate as a fraction (e.g., 0.005).
+    """
+    return float(apr) / 100 / 12
+
+
+class AnnuityFactorCache:
+    """
+    A bounded, least-recently-used memo of annuity factors.
+
+    The annuity factor is the monthly payment per unit of principal for a
+    given monthly rate and term. Real portfolios repeat the same few
+    (rate, term) pairs, so caching the factor skips the power calculation
+    for most loans.
+
+    Attributes:
+        maxsize (int): The most factors kept before the oldest is evicted.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to compute the factor.
+    """
+
+    def __init__(self, maxsize=ANNUITY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._factors = OrderedDict()
+
+    def factor(self, monthly_interest_rate, loan_term_months):
+        """
+        Returns the annuity factor, computing and storing it on a miss.
+
+        Args:
+            monthly_interest_rate (float): The monthly rate as a fraction.
+            Must not be zero.
+            loan_term_months (int): The length of the loan term in months.
+
+        Returns:
+            float: The payment per unit of principal.
+        """
+        key = (float(monthly_interest_rate), int(loan_term_months))
+        factors = self._factors
+
+        if key in factors:
+            self.hits += 1
+            factors.move_to_end(key)
+            return factors[key]
+
+        self.misses += 1
+        value = annuity_factor(*key)
+
+        if self.maxsize > 0:
+            factors[key] = value
+            if len(factors) > self.maxsize:
+                factors.popitem(last=False)
+
+        return value
+
+    def resize(self, maxsize):
+        """
+        Changes the cache size, evicting the oldest factors if needed.
+
+        Args:
+            maxsize (int): The new maximum number of cached factors.
+        """
+        self.maxsize = maxsize
+        while len(self._factors) > max(maxsize, 0):
+            self._factors.popitem(last=False)
+
+    def clear(self):
+        """
+        Empties the cache and resets the hit and miss counters.
+        """
+        self._factors.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Reports the cache counters.
+
+        Returns:
+            dict: The 'hits', 'misses', 'size' and 'maxsize' of the cache.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._factors),
+            'maxsize': self.maxsize,
+        }
+
+
+ANNUITY_CACHE = AnnuityFactorCache()
+
+
+def annuity_factor(monthly_interest_rate, loan_term_months):
+    """
+    Calculates an annuity factor directly, without going through
+    ANNUITY_CACHE.
+
+    Args:
+        monthly_interest_rate (float): The monthly rate as a fraction.
+        Must not be zero.
+        loan_term_months (int): The length of the loan term in months.
 
+    Returns:
+        float: The payment per unit of principal.
+    """
+    return monthly_interest_rate / (
+        1 - (1 + monthly_interest_rate) ** -loan_term_months)
+
+
+class Instrumentation:
+    """
+    Opt-in timers and call counters for the calculator's hot paths.
+
+    Instrumented functions check the enabled flag once per call and do no
+    other work while it is off. Each named section records its calls, the
+    items processed (loans priced, values validated, schedule rows) and
+    the seconds spent. Counters belong to the current process, so the
+    worker shards of the parallel batch pricer are not included.
+
+    Attributes:
+        enabled (bool): Whether timings are being recorded.
+        sections (dict): 'calls', 'items' and 'seconds' for each section.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sections = {}
+
+    def enable(self):
+        """
+        Starts recording timings.
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stops recording timings, keeping the counters collected so far.
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Clears every section's counters.
+        """
+        self.sections.clear()
+
+    def add(self, section, seconds, items=1):
+        """
+        Adds one call to a section's counters.
+
+        Args:
+            section (str): The section name.
+            seconds (float): The time the call took.
+            items (int, optional): Items the call processed.
+        """
+        counters = self.sections.get(section)
+        if counters is None:
+            counters = self.sections[section] = {
+                'calls': 0, 'items': 0, 'seconds': 0.0}
+        counters['calls'] += 1
+        counters['items'] += items
+        counters['seconds'] += seconds
+
+    def record(self, section, start, items=1):
+        """
+        Adds one call that began at a perf_counter() reading.
+
+        Args:
+            section (str): The section name.
+            start (float): The perf_counter() value when the call began.
+            items (int, optional): Items the call processed.
+        """
+        self.add(section, perf_counter() - start, items)
+
+    def timed_rows(self, section, rows):
+        """
+        Times a row generator as its consumer pulls rows from it.
+
+        Only time spent producing rows is counted. The call is recorded
+        when the generator is exhausted or closed.
+
+        Args:
+            section (str): The section name.
+            rows (iterator): The rows to time.
+
+        Yields:
+            The rows, unchanged.
+        """
+        seconds = 0.0
+        items = 0
+        start = perf_counter()
+        try:
+            for row in rows:
+                seconds += perf_counter() - start
+                items += 1
+                yield row
+                start = perf_counter()
+            seconds += perf_counter() - start
+        finally:
+            self.add(section, seconds, items)
+
+    def snapshot(self):
+        """
+        Reports every counter in a JSON-serializable form.
+
+        Returns:
+            dict: 'enabled', 'sections' with each section's 'calls',
+            'items', 'seconds' and 'mean_seconds', and the
+            'annuity_cache' hit and miss counts.
+        """
+        sections = {}
+        for section, counters in sorted(self.sections.items()):
+            sections[section] = dict(
+                counters,
+                mean_seconds=counters['seconds'] / counters['calls'])
+
+        return {
+            'enabled': self.enabled,
+            'sections': sections,
+            'annuity_cache': ANNUITY_CACHE.stats(),
+        }
+
+    def write_snapshot(self, snapshot_path):
+        """
+        Writes snapshot() to a JSON file.
+
+        Args:
+            snapshot_path (str): Path of the file to write.
+        """
+        with open(snapshot_path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file, indent=2)
+
+
+INSTRUMENTATION = Instrumentation()
+
+
+def run_profiled(profile_path, function, *args):
+    """
+    Runs a function under cProfile and writes the profile to a file.
+
+    The profile is written even if the function raises. Load it with
+    pstats or any viewer that reads cProfile output.
+
+    Args:
+        profile_path (str): Path of the profile file to write.
+        function (callable): The function to run.
+        *args: Arguments passed to function.
+
+    Returns:
+        The function's return value.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args)
+    finally:
+        profiler.dump_stats(profile_path)
+
+
+def payment_from_monthly_rate(loan_amount,
+                              monthly_interest_rate,
+                              loan_term_months,
+                              cached=True):
+    """
+    Calculates the monthly payment from already converted values.
+
+    This is the shared core of the scalar and batch pricing paths, so it
+    does no parsing of its own. Annuity factors come from ANNUITY_CACHE
+    unless cached is False.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        monthly_interest_rate (float): The monthly rate as a fraction.
+        loan_term_months (int): The length of the loan term in months.
+        cached (bool, optional): Whether to use ANNUITY_CACHE. Callers
+        that probe many one-off rates, such as solver iterations, pass
+        False so they do not flush the cache. Defaults to True.
+
+    Returns:
+        float: The monthly payment amount.
+    """
     if monthly_interest_rate == 0:
-        return float(loan_amount) / int(loan_term_months)
+        return loan_amount / loan_term_months
 
-    return float(loan_amount) * (
-        monthly_interest_rate /
-        (1 - (1 + monthly_interest_rate) ** (-int(loan_term_months)))
-    )
+    if not cached:
+        return loan_amount * annuity_factor(monthly_interest_rate,
+                                            loan_term_months)
+    return loan_amount * ANNUITY_CACHE.factor(monthly_interest_rate,
+                                              loan_term_months)
+
+
+def loan_columns(loan_amounts, aprs, loan_terms_months):
+    """
+    Converts batch input columns to typed arrays ready for pricing.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+
+    Returns:
+        tuple: (amounts, monthly_rates, terms) as array.array columns.
+
+    Raises:
+        ValueError: If the three columns are not the same length.
+    """
+    amounts = array('d', map(float, loan_amounts))
+    rates = array('d', map(monthly_rate, aprs))
+    terms = array('l', map(int, loan_terms_months))
+
+    if not len(amounts) == len(rates) == len(terms):
+        raise ValueError('Batch columns must be the same length.')
+
+    return amounts, rates, terms
+
+
+def annuity_factors(rates, terms):
+    """
+    Finds the annuity factor of every loan in a batch.
+
+    Each distinct (rate, term) pair is worked out once, through
+    ANNUITY_CACHE, with zero-rate pairs mapped to 1 / term.
+
+    Args:
+        rates (array.array): The monthly rates as fractions.
+        terms (array.array): The loan terms in months.
+
+    Returns:
+        iterator: The payment per unit of principal, in input order.
+    """
+    pairs = list(zip(rates, terms))
+    factors = {(rate, months): 1 / months if rate == 0
+               else ANNUITY_CACHE.factor(rate, months)
+               for rate, months in set(pairs)}
+    return map(factors.__getitem__, pairs)
+
+
+def calculate_monthly_payments(loan_amounts,
+                               aprs,
+                               loan_terms_months):
+    """
+    Calculates monthly payments for a batch of loans in a single pass.
+
+    Each column is converted to a typed array once up front. One annuity
+    factor is computed per distinct (rate, term) pair, and the payments
+    column is the loan amounts multiplied element-wise by their factors.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+
+    Returns:
+        array.array: The monthly payments as doubles, in input order.
+
+    Raises:
+        ValueError: If the three columns are not the same length.
+    """
+    start = perf_counter() if INSTRUMENTATION.enabled else None
+    amounts, rates, terms = loan_columns(loan_amounts, aprs,
+                                         loan_terms_months)
+    payments = array('d', map(mul, amounts, annuity_factors(rates, terms)))
+    if start is not None:
+        INSTRUMENTATION.record('batch_pricing', start, len(payments))
+    return payments
+
+
+def balance_from_monthly_rate(loan_amount,
+                              monthly_interest_rate,
+                              loan_term_months,
+                              payments_made):
+    """
+    Calculates the balance left after a number of payments in closed form.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        monthly_interest_rate (float): The monthly rate as a fraction.
+        loan_term_months (int): The length of the loan term in months.
+        payments_made (int): Payments made so far, clamped to the term.
+
+    Returns:
+        float: The outstanding balance.
+    """
+    payments_made = min(max(payments_made, 0), loan_term_months)
+
+    if payments_made == loan_term_months:
+        return 0.0
+
+    if monthly_interest_rate == 0:
+        return loan_amount * (1 - payments_made / loan_term_months)
+
+    payment = payment_from_monthly_rate(loan_amount,
+                                        monthly_interest_rate,
+                                        loan_term_months)
+    growth = (1 + monthly_interest_rate) ** payments_made
+    return (loan_amount * growth
+            - payment * (growth - 1) / monthly_interest_rate)
+
+
+def calculate_balance(loan_amount, apr, loan_term_months, payments_made):
+    """
+    Calculates the balance left after a number of payments.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        payments_made (int): Payments made so far.
+
+    Returns:
+        float: The outstanding balance.
+    """
+    return balance_from_monthly_rate(float(loan_amount),
+                                     monthly_rate(apr),
+                                     int(loan_term_months),
+                                     int(payments_made))
+
+
+def calculate_cumulative_principal(loan_amount,
+                                   apr,
+                                   loan_term_months,
+                                   payments_made):
+    """
+    Calculates the principal repaid over the first payments of a loan.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        payments_made (int): Payments made so far.
+
+    Returns:
+        float: The principal repaid.
+    """
+    return float(loan_amount) - calculate_balance(loan_amount,
+                                                  apr,
+                                                  loan_term_months,
+                                                  payments_made)
+
+
+def calculate_cumulative_interest(loan_amount,
+                                  apr,
+                                  loan_term_months,
+                                  payments_made):
+    """
+    Calculates the interest paid over the first payments of a loan.
+
+    Pass the full loan term to get the total interest over the loan's life.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        payments_made (int): Payments made so far.
+
+    Returns:
+        float: The interest paid.
+    """
+    payments_made = min(max(int(payments_made), 0), int(loan_term_months))
+    payment = calculate_monthly_payment(loan_amount, apr, loan_term_months)
+    principal = calculate_cumulative_principal(loan_amount,
+                                               apr,
+                                               loan_term_months,
+                                               payments_made)
+    return payment * payments_made - principal
+
+
+def calculate_balances(loan_amounts,
+                       aprs,
+                       loan_terms_months,
+                       payments_made):
+    """
+    Calculates the balance after a number of payments for a batch of loans.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+        payments_made (int or iterable): Payments made, either one count
+        for every loan or one count per loan.
+
+    Returns:
+        array.array: The outstanding balances, in input order.
+    """
+    columns = loan_columns(loan_amounts, aprs, loan_terms_months)
+
+    if isinstance(payments_made, int):
+        payments_made = repeat(payments_made)
+
+    return array('d', map(balance_from_monthly_rate, *columns,
+                          map(int, payments_made)))
+
+
+def calculate_cumulative_totals(loan_amounts,
+                                aprs,
+                                loan_terms_months,
+                                payments_made):
+    """
+    Calculates principal and interest paid so far for a batch of loans.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+        payments_made (int or iterable): Payments made, either one count
+        for every loan or one count per loan.
+
+    Returns:
+        tuple: (principal, interest) as array.array columns.
+    """
+    amounts, rates, terms = loan_columns(loan_amounts,
+                                         aprs,
+                                         loan_terms_months)
+
+    if isinstance(payments_made, int):
+        payments_made = repeat(payments_made)
+    counts = array('l', (min(max(int(count), 0), term)
+                         for count, term in zip(payments_made, terms)))
+
+    payments = map(payment_from_monthly_rate, amounts, rates, terms)
+    balances = map(balance_from_monthly_rate, amounts, rates, terms, counts)
+    principal = array('d', map(sub, amounts, balances))
+    interest = array('d', map(sub, map(mul, payments, counts), principal))
+    return principal, interest
+
+
+def amortization_schedule(loan_amount,
+                          apr,
+                          loan_term_months):
+    """
+    Returns the month-by-month amortization schedule for one loan.
+
+    Rows are produced lazily, so only the current balance is held in memory.
+    The final payment absorbs any rounding residue so the loan closes at
+    exactly zero.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        iterator: (month, payment, principal, interest, balance) for each
+        month.
+    """
+    rows = schedule_from_monthly_rate(float(loan_amount),
+                                      monthly_rate(apr),
+                                      int(loan_term_months))
+    if INSTRUMENTATION.enabled:
+        return INSTRUMENTATION.timed_rows('schedule', rows)
+    return rows
+
+
+def schedule_from_monthly_rate(loan_amount,
+                               monthly_interest_rate,
+                               loan_term_months):
+    """
+    Yields an amortization schedule from already converted values.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        monthly_interest_rate (float): The monthly rate as a fraction.
+        loan_term_months (int): The length of the loan term in months.
+
+    Yields:
+        tuple: (month, payment, principal, interest, balance) for each month.
+    """
+    balance = loan_amount
+    payment = payment_from_monthly_rate(balance, monthly_interest_rate,
+                                        loan_term_months)
+
+    for month in range(1, loan_term_months + 1):
+        interest = balance * monthly_interest_rate
+        principal = payment - interest
+        if month == loan_term_months:
+            principal = balance
+        balance -= principal
+        yield (month, principal + interest, principal, interest, balance)
+
+
+def amortization_schedules(loans):
+    """
+    Lazily yields an amortization schedule for every loan in a stream.
+
+    Args:
+        loans (iterable): (loan_amount, apr, loan_term_months) triples.
+
+    Yields:
+        tuple: (loan_index, schedule) where schedule is the row generator
+        returned by amortization_schedule().
+    """
+    for index, (loan_amount, apr, loan_term_months) in enumerate(loans):
+        yield index, amortization_schedule(loan_amount, apr, loan_term_months)
 
 
 def print_monthly_payment(payment_amount):
@@ -200,19 +882,28 @@ def clear_screen():
         os.system('cls')
 
 
-def main():
+def new_session():
     """
-    Main function that runs the mortgage calculator.
+    Creates the state carried between quotes in one calculator session.
 
-    - Prompts the user for input
-    - Validates each input
-    - Calculates the monthly payment
-    - Prints the payment
-    - Prompts the user to decide if they want to perform another calculation
-    - If the user chooses to continue: clears the screen and reruns the script
-    - Else the program ends
+    Returns:
+        dict: The number of 'quotes' run and the 'last_payment' quoted.
+    """
+    return {'quotes': 0, 'last_payment': None}
+
+
+def run_quote(session):
     """
+    Runs one quote: prompts for and validates the loan details, then
+    calculates and prints the monthly payment.
+
+    Args:
+        session (dict): The session state from new_session(), updated
+        in place.
 
+    Returns:
+        float: The monthly payment.
+    """
     loan_amount = get_loan_amount()
     apr = get_apr()
     loan_term_months = get_loan_months()
@@ -223,10 +914,87 @@ def main():
 
     print_monthly_payment(monthly_payment)
 
-    if continue_calculating():
-        clear_screen()
-        main()
+    session['quotes'] += 1
+    session['last_payment'] = monthly_payment
+    return monthly_payment
+
+
+def run_session(session=None, clear_between_quotes=True):
+    """
+    Runs quotes in a loop until the user chooses to stop.
+
+    The loop is iterative, so the stack and the session state stay the
+    same size however many quotes are run.
+
+    Args:
+        session (dict, optional): Session state to continue. Defaults to
+        a new session.
+        clear_between_quotes (bool, optional): Whether to clear the screen
+        before each further quote. Defaults to True.
+
+    Returns:
+        dict: The session state.
+    """
+    if session is None:
+        session = new_session()
+
+    while True:
+        run_quote(session)
+
+        if not continue_calculating():
+            return session
+
+        if clear_between_quotes:
+            clear_screen()
+
+
+def run_scripted_session(input_stream, output_stream=None):
+    """
+    Runs a session that reads its answers from a stream instead of the
+    keyboard, for load-testing the console loop.
+
+    The session ends when the script answers anything but 'yes' to
+    running another calculation, or when the stream runs out.
+
+    Args:
+        input_stream (file): A text stream with one answer per line.
+        output_stream (file, optional): Where prompts are written.
+        Defaults to discarding them.
+
+    Returns:
+        dict: The session state.
+    """
+    session = new_session()
+    saved_stdin, saved_stdout = sys.stdin, sys.stdout
+
+    with open(os.devnull, 'w', encoding='utf-8') as null_stream:
+        sys.stdin = input_stream
+        sys.stdout = output_stream or null_stream
+        try:
+            run_session(session, clear_between_quotes=False)
+        except EOFError:
+            pass
+        finally:
+            sys.stdin, sys.stdout = saved_stdin, saved_stdout
+
+    return session
+
+
+def main():
+    """
+    Main function that runs the mortgage calculator.
+
+    - Prompts the user for input
+    - Validates each input
+    - Calculates the monthly payment
+    - Prints the payment
+    - Prompts the user to decide if they want to perform another calculation
+    - If the user chooses to continue: clears the screen and loops again
+    - Else the program ends
+    """
+    run_session()
 
 
-prompt(MESSAGES['welcome'])
-main()
+if __name__ == '__main__':
+    prompt(MESSAGES['welcome'])
+    main()
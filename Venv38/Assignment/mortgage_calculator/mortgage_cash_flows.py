@@ -0,0 +1,176 @@
+"""
+Mortgage Cash-Flow Aggregator
+
+Totals the projected principal and interest inflows of a whole book of
+loans for each calendar month.
+
+Months are counted from the start of the book: a loan with start month s
+makes its first payment in month s. Seasoned loans, with a negative start
+month, contribute only the payments that fall in month 0 or later.
+
+Loans that share an APR, term and start month have schedules that differ
+only by scale. They are therefore grouped, their principal summed, and
+one unit-loan schedule is scaled and added into the month-indexed totals
+for the whole group. Per-loan schedules are never built.
+
+The chunked mode adds a stream of loan chunks into the same totals, so
+memory depends on the horizon and not on the size of the book.
+"""
+from array import array
+
+import mortgage_calculator as mc
+
+MAX_UNIT_SCHEDULES = 1024
+
+
+def new_cash_flows():
+    """
+    Builds empty month-indexed cash-flow totals.
+
+    Returns:
+        dict: Empty 'principal' and 'interest' array.array columns.
+    """
+    return {'principal': array('d'), 'interest': array('d')}
+
+
+def unit_schedule(apr, loan_term_months, unit_schedules):
+    """
+    Returns the principal and interest columns of a one-unit loan.
+
+    Args:
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        unit_schedules (dict): Schedules already built, keyed by
+        (apr, loan_term_months). Cleared when it reaches
+        MAX_UNIT_SCHEDULES entries.
+
+    Returns:
+        tuple: (principal, interest) as array.array columns.
+    """
+    key = (apr, loan_term_months)
+    if key not in unit_schedules:
+        if len(unit_schedules) >= MAX_UNIT_SCHEDULES:
+            unit_schedules.clear()
+        rows = list(mc.amortization_schedule(1.0, apr, loan_term_months))
+        unit_schedules[key] = (array('d', (row[2] for row in rows)),
+                               array('d', (row[3] for row in rows)))
+    return unit_schedules[key]
+
+
+def group_loans(columns, start_months):
+    """
+    Sums the principal of loans that share an APR, term and start month.
+
+    Args:
+        columns (tuple): (loan_amounts, aprs, loan_terms_months).
+        start_months (iterable): The month of each loan's first payment.
+
+    Returns:
+        dict: Total principal keyed by (apr, loan_term_months,
+        start_month).
+    """
+    principal_by_group = {}
+    for loan_amount, apr, loan_term_months, start_month in zip(
+            *columns, start_months):
+        key = (float(apr), int(loan_term_months), int(start_month))
+        principal_by_group[key] = (principal_by_group.get(key, 0.0)
+                                   + float(loan_amount))
+    return principal_by_group
+
+
+def add_group(cash_flows, group, principal, unit_schedules):
+    """
+    Scales a unit schedule by a group's principal and adds it into
+    month-indexed cash-flow totals.
+
+    Args:
+        cash_flows (dict): Totals from new_cash_flows(), updated in place.
+        group (tuple): (apr, loan_term_months, start_month). A negative
+        start month is a seasoned loan; only its payments from month 0
+        onwards are added.
+        principal (float): The group's total principal.
+        unit_schedules (dict): Cache of unit schedules to reuse.
+    """
+    apr, months, start_month = group
+    end_month = start_month + months
+    if end_month <= 0:
+        return
+
+    principal_totals = cash_flows['principal']
+    interest_totals = cash_flows['interest']
+    for totals in (principal_totals, interest_totals):
+        if len(totals) < end_month:
+            totals.extend([0.0] * (end_month - len(totals)))
+
+    unit_principal, unit_interest = unit_schedule(apr, months, unit_schedules)
+    for offset in range(max(-start_month, 0), months):
+        month = start_month + offset
+        principal_totals[month] += principal * unit_principal[offset]
+        interest_totals[month] += principal * unit_interest[offset]
+
+
+def add_loans(cash_flows, columns, start_months, unit_schedules):
+    """
+    Adds a group of loans into month-indexed cash-flow totals.
+
+    Args:
+        cash_flows (dict): Totals from new_cash_flows(), updated in place.
+        columns (tuple): (loan_amounts, aprs, loan_terms_months).
+        start_months (iterable): The month of each loan's first payment.
+        A negative start month is a seasoned loan; only its payments from
+        month 0 onwards are added.
+        unit_schedules (dict): Cache of unit schedules to reuse.
+    """
+    for group, principal in group_loans(columns, start_months).items():
+        add_group(cash_flows, group, principal, unit_schedules)
+
+
+def aggregate_cash_flows(loan_amounts,
+                         aprs,
+                         loan_terms_months,
+                         start_months=None):
+    """
+    Totals principal and interest inflows by month for a book of loans.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+        start_months (iterable, optional): The month of each loan's first
+        payment. Defaults to month 0 for every loan.
+
+    Returns:
+        dict: 'principal' and 'interest' array.array columns, indexed by
+        month.
+    """
+    return aggregate_cash_flows_chunked(
+        [(loan_amounts, aprs, loan_terms_months, start_months)])
+
+
+def aggregate_cash_flows_chunked(chunks):
+    """
+    Totals principal and interest inflows by month from a stream of loan
+    chunks.
+
+    Each chunk is grouped and added before the next is read, so only one
+    chunk is held at a time.
+
+    Args:
+        chunks (iterable): (loan_amounts, aprs, loan_terms_months,
+        start_months) tuples; start_months may be None for month 0.
+
+    Returns:
+        dict: 'principal' and 'interest' array.array columns, indexed by
+        month.
+    """
+    cash_flows = new_cash_flows()
+    unit_schedules = {}
+
+    for loan_amounts, aprs, loan_terms_months, start_months in chunks:
+        loan_amounts = list(loan_amounts)
+        if start_months is None:
+            start_months = [0] * len(loan_amounts)
+        add_loans(cash_flows, (loan_amounts, aprs, loan_terms_months),
+                  start_months, unit_schedules)
+
+    return cash_flows
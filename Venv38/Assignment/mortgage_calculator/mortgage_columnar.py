@@ -0,0 +1,332 @@
+"""
+Mortgage Columnar Output
+
+Writes batch prices and amortization schedules in a compact columnar
+binary file that readers can memory-map, instead of as text or CSV.
+
+File layout:
+- A header: the MAGIC bytes, the row count, the loan count and the number
+  of columns.
+- One descriptor per column: its name, struct typecode ('i' for int32,
+  'q' for int64, 'd' for float64), byte offset and item count.
+- The columns themselves, each stored contiguously and 8-byte aligned.
+
+Portfolio files use the same layout to hold loans for batch pricing, with
+loan_amount, apr and loan_term_months columns.
+
+Values are stored in native byte order. Schedule files also carry a
+'loan_start' column of loan_count + 1 row offsets, so the rows of loan i
+are rows loan_start[i] to loan_start[i + 1]. Reading a column or a loan's
+rows returns memoryview slices of the mapped file, so nothing is copied.
+"""
+import mmap
+import struct
+from array import array
+
+import mortgage_calculator as mc
+
+MAGIC = b'MTGCOLS1'
+HEADER = struct.Struct('<8sQQI4x')
+DESCRIPTOR = struct.Struct('<16s1s7xQQ')
+ALIGNMENT = 8
+
+SCHEDULE_COLUMNS = (('month', 'i'), ('payment', 'd'), ('principal', 'd'),
+                    ('interest', 'd'), ('balance', 'd'))
+PORTFOLIO_COLUMNS = (('loan_amount', 'd'), ('apr', 'd'),
+                     ('loan_term_months', 'i'))
+
+
+def aligned(offset):
+    """
+    Rounds a byte offset up to the column alignment.
+
+    Args:
+        offset (int): The byte offset.
+
+    Returns:
+        int: The aligned offset.
+    """
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def plan_layout(columns):
+    """
+    Works out where each column goes in the file.
+
+    Args:
+        columns (list): (name, typecode, item_count) for each column.
+
+    Returns:
+        tuple: (descriptors, file_size), where descriptors is a list of
+        (name, typecode, offset, item_count).
+    """
+    offset = aligned(HEADER.size + DESCRIPTOR.size * len(columns))
+    descriptors = []
+
+    for name, typecode, item_count in columns:
+        descriptors.append((name, typecode, offset, item_count))
+        offset = aligned(offset + struct.calcsize(typecode) * item_count)
+
+    return descriptors, offset
+
+
+def create_columnar_file(path, row_count, loan_count, columns):
+    """
+    Creates a columnar file of the right size and maps it for writing.
+
+    Args:
+        path (str): Path of the file to create.
+        row_count (int): The number of rows in the file.
+        loan_count (int): The number of loans in the file.
+        columns (list): (name, typecode, item_count) for each column.
+
+    Returns:
+        tuple: (mapping, views), where views maps each column name to a
+        writable memoryview. Release the views before closing the mapping.
+    """
+    descriptors, file_size = plan_layout(columns)
+
+    with open(path, 'w+b') as output:
+        output.truncate(file_size)
+        mapping = mmap.mmap(output.fileno(), file_size)
+
+    mapping[:HEADER.size] = HEADER.pack(MAGIC, row_count, loan_count,
+                                        len(descriptors))
+    return mapping, write_descriptors(mapping, descriptors)
+
+
+def write_descriptors(mapping, descriptors):
+    """
+    Writes the column descriptors and maps a view of each column.
+
+    Args:
+        mapping (mmap.mmap): The file, mapped for writing.
+        descriptors (list): (name, typecode, offset, item_count) for each
+        column, as from plan_layout().
+
+    Returns:
+        dict: A writable memoryview of each column, keyed by name.
+    """
+    views = {}
+    for index, (name, typecode, offset, item_count) in enumerate(descriptors):
+        start = HEADER.size + DESCRIPTOR.size * index
+        mapping[start:start + DESCRIPTOR.size] = DESCRIPTOR.pack(
+            name.encode('ascii'), typecode.encode('ascii'), offset,
+            item_count)
+        end = offset + struct.calcsize(typecode) * item_count
+        views[name] = memoryview(mapping)[offset:end].cast(typecode)
+    return views
+
+
+def close_columnar_file(mapping, views):
+    """
+    Releases the column views, then flushes and closes the mapping.
+
+    Args:
+        mapping (mmap.mmap): The mapped file.
+        views (dict): The column views to release.
+    """
+    for view in views.values():
+        view.release()
+    mapping.flush()
+    mapping.close()
+
+
+def write_prices(path, loan_amounts, aprs, loan_terms_months):
+    """
+    Prices a batch of loans and writes the payments as a columnar file.
+
+    Args:
+        path (str): Path of the file to write.
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+
+    Returns:
+        int: The number of loans written.
+    """
+    payments = mc.calculate_monthly_payments(loan_amounts, aprs,
+                                             loan_terms_months)
+    mapping, views = create_columnar_file(
+        path, len(payments), len(payments),
+        [('monthly_payment', 'd', len(payments))])
+    views['monthly_payment'][:] = payments
+    close_columnar_file(mapping, views)
+    return len(payments)
+
+
+def write_schedules(path, loan_amounts, aprs, loan_terms_months):
+    """
+    Writes the amortization schedule of every loan as a columnar file.
+
+    The file is sized up front from the loan terms, and each schedule is
+    streamed straight into the mapped columns, so memory use does not
+    grow with the number of rows.
+
+    Args:
+        path (str): Path of the file to write.
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+
+    Returns:
+        int: The number of rows written.
+    """
+    aprs = [float(apr) for apr in aprs]
+    amounts, _, terms = mc.loan_columns(loan_amounts, aprs,
+                                        loan_terms_months)
+    row_count = sum(terms)
+    columns = [('loan_start', 'q', len(terms) + 1)]
+    columns += [(name, typecode, row_count)
+                for name, typecode in SCHEDULE_COLUMNS]
+    mapping, views = create_columnar_file(path, row_count, len(terms),
+                                          columns)
+    row = 0
+
+    for index, loan in enumerate(zip(amounts, aprs, terms)):
+        views['loan_start'][index] = row
+        row = fill_schedule(views, row, loan)
+
+    views['loan_start'][len(terms)] = row
+    close_columnar_file(mapping, views)
+    return row
+
+
+def fill_schedule(views, row, loan):
+    """
+    Streams one loan's amortization schedule into the schedule columns.
+
+    Args:
+        views (dict): The writable column views.
+        row (int): The row at which the loan's schedule starts.
+        loan (tuple): (loan_amount, apr, loan_term_months).
+
+    Returns:
+        int: The row after the loan's last row.
+    """
+    for values in mc.amortization_schedule(*loan):
+        for (name, _), value in zip(SCHEDULE_COLUMNS, values):
+            views[name][row] = value
+        row += 1
+    return row
+
+
+def write_portfolio(path, loan_amounts, aprs, loan_terms_months):
+    """
+    Writes loans as a columnar portfolio file for memory-mapped pricing.
+
+    Args:
+        path (str): Path of the file to write.
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+
+    Returns:
+        int: The number of loans written.
+
+    Raises:
+        OverflowError: If a term does not fit the int32 term column. Terms
+        that pass validation are at most mc.MAX_TERM_MONTHS, which does.
+    """
+    aprs = array('d', map(float, aprs))
+    amounts, _, terms = mc.loan_columns(loan_amounts, aprs,
+                                        loan_terms_months)
+    # Convert before creating the file, so a term that does not fit
+    # leaves no half-written portfolio behind.
+    columns = [array(typecode, values) for (_, typecode), values
+               in zip(PORTFOLIO_COLUMNS, (amounts, aprs, terms))]
+    mapping, views = create_columnar_file(
+        path, len(terms), len(terms),
+        [(name, typecode, len(terms))
+         for name, typecode in PORTFOLIO_COLUMNS])
+
+    for (name, _), values in zip(PORTFOLIO_COLUMNS, columns):
+        views[name][:] = values
+
+    close_columnar_file(mapping, views)
+    return len(terms)
+
+
+class ColumnarFile:
+    """
+    A read-only, memory-mapped view of a columnar file.
+
+    Column and row views borrow the mapping, so release them (or drop
+    every reference) before calling close().
+
+    Attributes:
+        row_count (int): The number of rows in the file.
+        loan_count (int): The number of loans in the file.
+        columns (dict): (typecode, offset, item_count) keyed by name.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as source:
+            self.mapping = mmap.mmap(source.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+
+        magic, self.row_count, self.loan_count, column_count = \
+            HEADER.unpack_from(self.mapping)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a mortgage columnar file.')
+
+        self.columns = {}
+        for index in range(column_count):
+            name, typecode, offset, item_count = DESCRIPTOR.unpack_from(
+                self.mapping, HEADER.size + DESCRIPTOR.size * index)
+            self.columns[name.rstrip(b'\0').decode('ascii')] = (
+                typecode.decode('ascii'), offset, item_count)
+
+    def column(self, name):
+        """
+        Returns a whole column without copying it.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            memoryview: The column's values.
+        """
+        typecode, offset, item_count = self.columns[name]
+        end = offset + struct.calcsize(typecode) * item_count
+        return memoryview(self.mapping)[offset:end].cast(typecode)
+
+    def loan_rows(self, loan):
+        """
+        Returns one loan's schedule rows without copying them.
+
+        Args:
+            loan (int): The loan's index in the file.
+
+        Returns:
+            dict: A memoryview slice of each schedule column.
+        """
+        starts = self.column('loan_start')
+        start, end = starts[loan], starts[loan + 1]
+        starts.release()
+        return {name: self.column(name)[start:end]
+                for name, _ in SCHEDULE_COLUMNS}
+
+    def portfolio_views(self):
+        """
+        Returns the loan columns of a portfolio file without copying them.
+
+        The views can be sliced and passed straight to
+        mortgage_calculator.calculate_monthly_payments().
+
+        Returns:
+            tuple: (loan_amounts, aprs, loan_terms_months) memoryviews.
+        """
+        return tuple(self.column(name) for name, _ in PORTFOLIO_COLUMNS)
+
+    def close(self):
+        """
+        Closes the mapping.
+        """
+        self.mapping.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,191 @@
+"""
+Mortgage Decimal Pricing
+
+An opt-in, cent-exact pricing mode for reports that must reconcile to the
+penny. Payments, interest and balances are calculated with decimal.Decimal
+and every amount that changes hands is rounded to the cent, so a schedule's
+rows add up exactly. The float functions in mortgage_calculator remain the
+fast default.
+
+Run this script to benchmark the two modes on a synthetic portfolio:
+    python mortgage_decimal.py [LOAN_COUNT]
+"""
+import random
+import sys
+import time
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+
+import mortgage_calculator as mc
+
+CENT = Decimal('0.01')
+PRECISION = 34
+BENCHMARK_LOAN_COUNT = 100000
+BENCHMARK_SEED = 101
+
+
+def to_decimal(value):
+    """
+    Converts a value to Decimal without picking up binary float noise.
+
+    Args:
+        value (str, int, float or Decimal): The value to convert.
+
+    Returns:
+        Decimal: The converted value.
+    """
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def calculate_monthly_payment_decimal(loan_amount,
+                                      apr,
+                                      loan_term_months,
+                                      rounding=ROUND_HALF_UP):
+    """
+    Calculates the monthly payment as an exact, cent-rounded Decimal.
+
+    Args:
+        loan_amount (str or Decimal): The total amount of the loan.
+        apr (str or Decimal): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        rounding (str, optional): A decimal rounding mode.
+        Defaults to ROUND_HALF_UP.
+
+    Returns:
+        Decimal: The monthly payment, rounded to the cent.
+    """
+    with localcontext() as context:
+        context.prec = PRECISION
+        amount = to_decimal(loan_amount)
+        rate = to_decimal(apr) / 1200
+        months = int(loan_term_months)
+
+        if rate == 0:
+            payment = amount / months
+        else:
+            payment = amount * rate / (1 - (1 + rate) ** -months)
+
+        return payment.quantize(CENT, rounding=rounding)
+
+
+def calculate_monthly_payments_decimal(loan_amounts,
+                                       aprs,
+                                       loan_terms_months,
+                                       rounding=ROUND_HALF_UP):
+    """
+    Calculates cent-exact monthly payments for a batch of loans.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+        rounding (str, optional): A decimal rounding mode.
+
+    Returns:
+        list: The monthly payments as Decimals, in input order.
+    """
+    return [calculate_monthly_payment_decimal(amount, apr, months, rounding)
+            for amount, apr, months
+            in zip(loan_amounts, aprs, loan_terms_months)]
+
+
+def decimal_amortization_schedule(loan_amount,
+                                  apr,
+                                  loan_term_months,
+                                  rounding=ROUND_HALF_UP):
+    """
+    Yields a cent-exact amortization schedule for one loan.
+
+    Each month's interest is rounded to the cent before the principal is
+    worked out, and the final payment settles whatever balance remains, so
+    the principal column sums to exactly the loan amount. All arithmetic
+    runs at PRECISION digits; the context is left before each row is
+    yielded, so the caller's decimal context is never changed.
+
+    Args:
+        loan_amount (str or Decimal): The total amount of the loan.
+        apr (str or Decimal): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        rounding (str, optional): A decimal rounding mode.
+
+    Yields:
+        tuple: (month, payment, principal, interest, balance) as Decimals.
+    """
+    payment = calculate_monthly_payment_decimal(loan_amount, apr,
+                                                loan_term_months, rounding)
+    with localcontext() as context:
+        context.prec = PRECISION
+        balance = to_decimal(loan_amount).quantize(CENT, rounding=rounding)
+        rate = to_decimal(apr) / 1200
+    months = int(loan_term_months)
+
+    for month in range(1, months + 1):
+        with localcontext(context):
+            interest = (balance * rate).quantize(CENT, rounding=rounding)
+            principal = payment - interest
+            if month == months or principal > balance:
+                principal = balance
+            balance -= principal
+            row = (month, principal + interest, principal, interest, balance)
+        yield row
+        if balance == 0:
+            return
+
+
+def synthetic_portfolio(loan_count, seed=BENCHMARK_SEED):
+    """
+    Generates reproducible loan columns as they would arrive from a file.
+
+    Args:
+        loan_count (int): Number of loans to generate.
+        seed (int, optional): Seed for the random generator.
+
+    Returns:
+        tuple: (loan_amounts, aprs, loan_terms_months) as lists of strings.
+    """
+    rng = random.Random(seed)
+    amounts = [f'{rng.uniform(10000, 900000):.2f}' for _ in range(loan_count)]
+    aprs = [f'{rng.uniform(0, 9):.3f}' for _ in range(loan_count)]
+    terms = [str(rng.choice((120, 180, 240, 360))) for _ in range(loan_count)]
+    return amounts, aprs, terms
+
+
+def benchmark_pricing_modes(loan_count=BENCHMARK_LOAN_COUNT):
+    """
+    Times float and Decimal batch pricing over the same portfolio.
+
+    Args:
+        loan_count (int, optional): Number of loans to price.
+
+    Returns:
+        dict: Seconds taken by each mode and the largest difference
+        between the rounded float payment and the Decimal payment.
+    """
+    columns = synthetic_portfolio(loan_count)
+
+    start = time.perf_counter()
+    float_payments = mc.calculate_monthly_payments(*columns)
+    float_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decimal_payments = calculate_monthly_payments_decimal(*columns)
+    decimal_seconds = time.perf_counter() - start
+
+    max_difference = max(
+        (abs(to_decimal(round(fast, 2)) - exact)
+         for fast, exact in zip(float_payments, decimal_payments)),
+        default=Decimal(0))
+
+    return {
+        'loans': loan_count,
+        'float_seconds': float_seconds,
+        'decimal_seconds': decimal_seconds,
+        'max_cent_difference': str(max_difference),
+    }
+
+
+if __name__ == '__main__':
+    COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else BENCHMARK_LOAN_COUNT
+    for name, result in benchmark_pricing_modes(COUNT).items():
+        mc.prompt(f'{name}: {result}')
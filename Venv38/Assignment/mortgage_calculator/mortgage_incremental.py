@@ -0,0 +1,188 @@
+"""
+Mortgage Incremental Model
+
+An amortization model for interactive what-if tools. It keeps the balance
+trajectory it has already worked out. When one input changes, only the
+parts of the trajectory that depend on it are redone:
+
+- Loan amount: Every balance and payment scales linearly with the
+  principal, so the cached trajectory is rescaled instead of recomputed.
+- APR or term: The whole trajectory depends on them, so it is discarded
+  and rebuilt lazily as months are requested.
+- A rate change from month k: Balances before month k still hold, so the
+  model keeps them and re-amortizes from month k onward.
+
+Balances are only calculated up to the latest month asked for.
+"""
+from array import array
+
+import mortgage_calculator as mc
+
+
+class IncrementalAmortization:
+    """
+    An amortization schedule that caches its state between changes.
+
+    Attributes:
+        loan_amount (float): The total amount of the loan.
+        loan_term_months (int): The length of the loan term in months.
+        segments (list): (start_month, apr) rate segments in month order.
+        balances (array.array): balances[k] is the balance after k
+        payments, calculated up to the latest month requested.
+        payments (dict): The regular payment of each segment that has
+        been reached, keyed by the segment's start month.
+        months_computed (int): Months calculated since the model was made,
+        for checking how much work a change caused.
+    """
+
+    def __init__(self, loan_amount, apr, loan_term_months):
+        self.loan_amount = float(loan_amount)
+        self.loan_term_months = int(loan_term_months)
+        self.segments = [(1, float(apr))]
+        self.balances = array('d', [self.loan_amount])
+        self.payments = {}
+        self.months_computed = 0
+
+    def discard_from(self, month):
+        """
+        Drops cached state for a month and every month after it.
+
+        Args:
+            month (int): The first month whose state is no longer valid.
+        """
+        del self.balances[month:]
+        for start in [start for start in self.payments if start >= month]:
+            del self.payments[start]
+
+    def set_loan_amount(self, loan_amount):
+        """
+        Changes the loan amount by rescaling the cached trajectory.
+
+        Args:
+            loan_amount (float): The new loan amount.
+        """
+        scale = float(loan_amount) / self.loan_amount
+        self.loan_amount = float(loan_amount)
+        self.balances = array('d', (balance * scale
+                                    for balance in self.balances))
+        self.payments = {start: payment * scale
+                         for start, payment in self.payments.items()}
+
+    def set_apr(self, apr):
+        """
+        Changes the APR for the whole loan.
+
+        Args:
+            apr (float): The new annual interest rate as a percentage.
+        """
+        self.segments = [(1, float(apr))]
+        self.discard_from(1)
+
+    def set_loan_term(self, loan_term_months):
+        """
+        Changes the loan term.
+
+        Args:
+            loan_term_months (int): The new loan term in months.
+        """
+        self.loan_term_months = int(loan_term_months)
+        self.discard_from(1)
+
+    def change_rate_from(self, month, apr):
+        """
+        Changes the APR from a given month onward, keeping earlier months.
+
+        The balance at that point is re-amortized over the remaining term.
+
+        Args:
+            month (int): The first month at the new rate.
+            apr (float): The new annual interest rate as a percentage.
+        """
+        month = min(max(int(month), 1), self.loan_term_months)
+        self.segments = [segment for segment in self.segments
+                         if segment[0] < month]
+        self.segments.append((month, float(apr)))
+        self.discard_from(month)
+
+    def segment_at(self, month):
+        """
+        Finds the rate segment that covers a month.
+
+        Args:
+            month (int): The month.
+
+        Returns:
+            tuple: The (start_month, apr) segment.
+        """
+        return [segment for segment in self.segments
+                if segment[0] <= month][-1]
+
+    def extend_to(self, month):
+        """
+        Calculates balances up to a month, starting from the cached ones.
+
+        Args:
+            month (int): The last month needed.
+        """
+        month = min(month, self.loan_term_months)
+
+        while len(self.balances) <= month:
+            current = len(self.balances)
+            balance = self.balances[-1]
+            start, apr = self.segment_at(current)
+            rate = mc.monthly_rate(apr)
+
+            if start not in self.payments:
+                self.payments[start] = mc.payment_from_monthly_rate(
+                    balance, rate, self.loan_term_months - start + 1)
+
+            if current == self.loan_term_months:
+                self.balances.append(0.0)
+            else:
+                principal = self.payments[start] - balance * rate
+                self.balances.append(balance - principal)
+            self.months_computed += 1
+
+    def balance(self, month):
+        """
+        Returns the balance after a number of payments.
+
+        Args:
+            month (int): Payments made.
+
+        Returns:
+            float: The outstanding balance.
+        """
+        month = min(max(int(month), 0), self.loan_term_months)
+        self.extend_to(month)
+        return self.balances[month]
+
+    def monthly_payment(self, month=1):
+        """
+        Returns the regular payment due in a month.
+
+        Args:
+            month (int, optional): The month. Defaults to the first.
+
+        Returns:
+            float: The payment for the segment covering that month.
+        """
+        month = min(max(int(month), 1), self.loan_term_months)
+        self.extend_to(month)
+        return self.payments[self.segment_at(month)[0]]
+
+    def schedule(self):
+        """
+        Yields the full schedule, reusing every cached month.
+
+        Yields:
+            tuple: (month, payment, principal, interest, balance).
+        """
+        self.extend_to(self.loan_term_months)
+
+        for month in range(1, self.loan_term_months + 1):
+            opening = self.balances[month - 1]
+            closing = self.balances[month]
+            interest = opening * mc.monthly_rate(self.segment_at(month)[1])
+            principal = opening - closing
+            yield (month, principal + interest, principal, interest, closing)
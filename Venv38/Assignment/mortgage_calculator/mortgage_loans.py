@@ -0,0 +1,230 @@
+"""
+Mortgage Loan Records
+
+Validated, pre-converted loan types, so loan values are parsed and checked
+once instead of being passed around as strings and converted on every
+calculation.
+
+- Loan: One loan, stored in __slots__ to keep each instance small.
+- LoanBook: Many loans, stored as parallel typed arrays. Iterating,
+  slicing and filtering a book work on the arrays and never build Loan
+  objects; use LoanBook.loan() to get one when needed.
+"""
+from array import array
+
+import mortgage_calculator as mc
+
+
+def validated_values(loan_amount, apr, loan_term_months):
+    """
+    Validates and converts one loan's values.
+
+    Args:
+        loan_amount (str or float): The total amount of the loan.
+        apr (str or float): The annual interest rate as a percentage.
+        loan_term_months (str or int): The loan term in months.
+
+    Returns:
+        tuple: (loan_amount, apr, loan_term_months) as float, float, int.
+
+    Raises:
+        ValueError: If a value fails validation. The message is the
+        MESSAGES key of the error.
+    """
+    error = (mc.input_error(loan_amount, float)
+             or mc.input_error(apr, float, True)
+             or mc.input_error(loan_term_months, int))
+    if error:
+        raise ValueError(error)
+
+    return float(loan_amount), float(apr), int(loan_term_months)
+
+
+class Loan:
+    """
+    A single validated loan.
+
+    Attributes:
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+    """
+
+    __slots__ = ('loan_amount', 'apr', 'loan_term_months')
+
+    def __init__(self, loan_amount, apr, loan_term_months):
+        self.loan_amount, self.apr, self.loan_term_months = \
+            validated_values(loan_amount, apr, loan_term_months)
+
+    def __repr__(self):
+        return (f'Loan({self.loan_amount!r}, {self.apr!r}, '
+                f'{self.loan_term_months!r})')
+
+    def __eq__(self, other):
+        if not isinstance(other, Loan):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def values(self):
+        """
+        Returns the loan's values as a tuple.
+
+        Returns:
+            tuple: (loan_amount, apr, loan_term_months).
+        """
+        return self.loan_amount, self.apr, self.loan_term_months
+
+    def monthly_payment(self):
+        """
+        Calculates the loan's monthly payment.
+
+        Returns:
+            float: The monthly payment amount.
+        """
+        return mc.payment_from_monthly_rate(self.loan_amount,
+                                            mc.monthly_rate(self.apr),
+                                            self.loan_term_months)
+
+    def schedule(self):
+        """
+        Returns the loan's amortization schedule generator.
+
+        Returns:
+            generator: Rows from mortgage_calculator.amortization_schedule().
+        """
+        return mc.amortization_schedule(*self.values())
+
+
+class LoanBook:
+    """
+    A collection of validated loans stored as parallel typed arrays.
+
+    Attributes:
+        loan_amounts (array.array): The loan amounts, as doubles.
+        aprs (array.array): The APRs as percentages, as doubles.
+        loan_terms_months (array.array): The loan terms, as integers.
+    """
+
+    __slots__ = ('loan_amounts', 'aprs', 'loan_terms_months')
+
+    def __init__(self, loan_amounts=(), aprs=(), loan_terms_months=()):
+        self.loan_amounts = array('d')
+        self.aprs = array('d')
+        self.loan_terms_months = array('l')
+        self.extend(loan_amounts, aprs, loan_terms_months)
+
+    @classmethod
+    def from_arrays(cls, loan_amounts, aprs, loan_terms_months):
+        """
+        Builds a book around arrays that are already validated, without
+        checking or copying them.
+
+        Args:
+            loan_amounts (array.array): Loan amounts with typecode 'd'.
+            aprs (array.array): APRs with typecode 'd'.
+            loan_terms_months (array.array): Terms with typecode 'l'.
+
+        Returns:
+            LoanBook: The new book.
+        """
+        book = cls()
+        book.loan_amounts = loan_amounts
+        book.aprs = aprs
+        book.loan_terms_months = loan_terms_months
+        return book
+
+    def append(self, loan_amount, apr, loan_term_months):
+        """
+        Validates and adds one loan.
+
+        Args:
+            loan_amount (str or float): The total amount of the loan.
+            apr (str or float): The annual interest rate as a percentage.
+            loan_term_months (str or int): The loan term in months.
+
+        Raises:
+            ValueError: If a value fails validation.
+        """
+        loan_amount, apr, loan_term_months = validated_values(
+            loan_amount, apr, loan_term_months)
+        self.loan_amounts.append(loan_amount)
+        self.aprs.append(apr)
+        self.loan_terms_months.append(loan_term_months)
+
+    def extend(self, loan_amounts, aprs, loan_terms_months):
+        """
+        Validates and adds many loans given as columns.
+
+        Args:
+            loan_amounts (iterable): The loan amounts.
+            aprs (iterable): The annual interest rates as percentages.
+            loan_terms_months (iterable): The loan terms in months.
+
+        Raises:
+            ValueError: If a value fails validation. Loans before the
+            failing one are kept.
+        """
+        for values in zip(loan_amounts, aprs, loan_terms_months):
+            self.append(*values)
+
+    def __len__(self):
+        return len(self.loan_amounts)
+
+    def __iter__(self):
+        """
+        Iterates over the loans as (loan_amount, apr, loan_term_months)
+        tuples.
+        """
+        return zip(self.loan_amounts, self.aprs, self.loan_terms_months)
+
+    def __getitem__(self, index):
+        """
+        Returns a sub-book for a slice, or a values tuple for an integer.
+        """
+        if isinstance(index, slice):
+            return LoanBook.from_arrays(self.loan_amounts[index],
+                                        self.aprs[index],
+                                        self.loan_terms_months[index])
+        return (self.loan_amounts[index], self.aprs[index],
+                self.loan_terms_months[index])
+
+    def loan(self, index):
+        """
+        Returns one loan as a Loan object.
+
+        Args:
+            index (int): The loan's position in the book.
+
+        Returns:
+            Loan: The loan.
+        """
+        return Loan(*self[index])
+
+    def filter(self, predicate):
+        """
+        Returns a new book holding the loans that match a predicate.
+
+        Args:
+            predicate (callable): Called with (loan_amount, apr,
+            loan_term_months); loans for which it is true are kept.
+
+        Returns:
+            LoanBook: The matching loans.
+        """
+        book = LoanBook()
+        for loan_amount, apr, loan_term_months in self:
+            if predicate(loan_amount, apr, loan_term_months):
+                book.loan_amounts.append(loan_amount)
+                book.aprs.append(apr)
+                book.loan_terms_months.append(loan_term_months)
+        return book
+
+    def monthly_payments(self):
+        """
+        Prices every loan in the book with the batch pricer.
+
+        Returns:
+            array.array: The monthly payments, in book order.
+        """
+        return mc.calculate_monthly_payments(self.loan_amounts, self.aprs,
+                                             self.loan_terms_months)
@@ -0,0 +1,294 @@
+"""
+Mortgage Monte Carlo Simulator
+
+Prices a portfolio of adjustable-rate mortgages on many simulated paths of
+the index rate, to see the spread of payments and balances the book could
+face.
+
+Index rates follow a Vasicek model, stepped exactly from one ARM reset to
+the next. Paths are generated in seeded blocks, and each block is priced
+in a worker process. Every block reports back quantile sketches instead of
+raw values, so memory stays bounded however many paths are run.
+
+For each path the simulator records three portfolio totals:
+- 'payment': The total monthly payment due in the horizon month.
+- 'balance': The total balance left after the horizon month.
+- 'interest': The total interest over the life of every loan.
+"""
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import mortgage_arm as arm_engine
+
+DEFAULT_MODEL = {
+    'initial_rate': 4.0,
+    'long_run_rate': 4.5,
+    'speed': 0.3,
+    'volatility': 1.0,
+}
+
+DEFAULT_SIMULATION = {
+    'paths': 10000,
+    'block_size': 500,
+    'horizon_month': 84,
+    'seed': 0,
+    'workers': None,
+}
+
+METRICS = ('payment', 'balance', 'interest')
+REPORTED_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+SKETCH_ACCURACY = 0.005
+
+
+class QuantileSketch:
+    """
+    A mergeable sketch of a distribution with bounded relative error.
+
+    Values are counted in logarithmic buckets, so any quantile is answered
+    within SKETCH_ACCURACY of its true relative value. Memory grows with
+    the spread of the values, not with how many are added. Zero and
+    negative values share a single bucket.
+
+    Attributes:
+        count (int): How many values have been added.
+        total (float): The sum of the values added.
+    """
+
+    def __init__(self, accuracy=SKETCH_ACCURACY):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.count = 0
+        self.total = 0.0
+        self.zero_count = 0
+        self.buckets = {}
+
+    def add(self, value):
+        """
+        Adds one value to the sketch.
+
+        Args:
+            value (float): The value to add.
+        """
+        self.count += 1
+        self.total += value
+        if value <= 0:
+            self.zero_count += 1
+            return
+
+        index = math.ceil(math.log(value, self.gamma))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        """
+        Folds another sketch with the same accuracy into this one.
+
+        Args:
+            other (QuantileSketch): The sketch to merge.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.zero_count += other.zero_count
+        for index, bucket_count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+
+    def quantile(self, fraction):
+        """
+        Estimates a quantile of the values added so far.
+
+        Args:
+            fraction (float): The quantile to estimate, from 0 to 1.
+
+        Returns:
+            float: The estimated value, or NaN if the sketch is empty.
+        """
+        if self.count == 0:
+            return math.nan
+
+        rank = fraction * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def summary(self):
+        """
+        Summarises the sketch for reporting.
+
+        Returns:
+            dict: The count, mean and REPORTED_QUANTILES of the values.
+        """
+        summary = {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else math.nan,
+        }
+        for fraction in REPORTED_QUANTILES:
+            summary[f'p{fraction * 100:g}'] = self.quantile(fraction)
+        return summary
+
+
+def vasicek_block(model, path_count, step_count, step_years, rng):
+    """
+    Generates a block of index-rate paths from the Vasicek model.
+
+    The paths are advanced together one step at a time using the model's
+    exact transition, so the step size can be a whole reset period.
+
+    Args:
+        model (dict): Model parameters; missing keys come from
+        DEFAULT_MODEL.
+        path_count (int): Number of paths in the block.
+        step_count (int): Number of rates per path.
+        step_years (float): Time between steps, in years.
+        rng (random.Random): The random number generator to draw from.
+
+    Returns:
+        list: path_count lists of step_count index rates, as percentages.
+    """
+    model = {**DEFAULT_MODEL, **model}
+    decay = math.exp(-model['speed'] * step_years)
+    drift = model['long_run_rate'] * (1 - decay)
+    spread = model['volatility'] * math.sqrt(
+        (1 - decay ** 2) / (2 * model['speed']))
+
+    rates = [model['initial_rate']] * path_count
+    paths = [[] for _ in range(path_count)]
+
+    for _ in range(step_count):
+        rates = [rate * decay + drift + spread * rng.gauss(0, 1)
+                 for rate in rates]
+        for path, rate in zip(paths, rates):
+            path.append(rate)
+
+    return paths
+
+
+def principal_by_term(loan_amounts, loan_terms_months):
+    """
+    Totals the portfolio's principal for each distinct loan term.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        loan_terms_months (iterable): The loan terms in months.
+
+    Returns:
+        dict: Total principal keyed by term in months.
+    """
+    totals = {}
+    for loan_amount, loan_term_months in zip(loan_amounts,
+                                             loan_terms_months):
+        months = int(loan_term_months)
+        totals[months] = totals.get(months, 0.0) + float(loan_amount)
+    return totals
+
+
+def price_path(term_principal, arm, index_path, horizon_month):
+    """
+    Prices the whole portfolio on one index-rate path.
+
+    Every loan with the same term follows the same unit-loan schedule, so
+    one schedule per distinct term is scaled by that term's principal.
+
+    Args:
+        term_principal (dict): Total principal keyed by term.
+        arm (dict): ARM terms shared by the portfolio.
+        index_path (list): Index rates for each reset.
+        horizon_month (int): The month reported for payment and balance.
+
+    Returns:
+        dict: The portfolio 'payment', 'balance' and 'interest' totals.
+    """
+    totals = dict.fromkeys(METRICS, 0.0)
+
+    for months, principal in term_principal.items():
+        rate_path = arm_engine.arm_rate_path(arm, index_path, months)
+        for month, _, payment, _, interest, balance in \
+                arm_engine.arm_schedule(1.0, months, rate_path):
+            totals['interest'] += principal * interest
+            if month == horizon_month:
+                totals['payment'] += principal * payment
+                totals['balance'] += principal * balance
+
+    return totals
+
+
+def simulate_block(term_principal, arm, model, simulation, block):
+    """
+    Generates and prices one block of paths inside a worker process.
+
+    Each block seeds its own generator from the simulation seed and the
+    block number, so results do not depend on the number of workers.
+
+    Args:
+        term_principal (dict): Total principal keyed by term.
+        arm (dict): ARM terms shared by the portfolio.
+        model (dict): Vasicek model parameters.
+        simulation (dict): Simulation settings.
+        block (int): The block number.
+
+    Returns:
+        dict: A QuantileSketch for each metric.
+    """
+    arm = {**arm_engine.DEFAULT_ARM, **arm}
+    first_path = block * simulation['block_size']
+    path_count = min(simulation['block_size'],
+                     simulation['paths'] - first_path)
+    step_count = max(math.ceil((max(term_principal, default=0)
+                                - arm['fixed_months'])
+                               / arm['reset_months']), 0)
+
+    rng = random.Random(f"{simulation['seed']}:{block}")
+    paths = vasicek_block(model, path_count, step_count,
+                          arm['reset_months'] / 12, rng)
+
+    sketches = {metric: QuantileSketch() for metric in METRICS}
+    for index_path in paths:
+        totals = price_path(term_principal, arm, index_path,
+                            simulation['horizon_month'])
+        for metric, value in totals.items():
+            sketches[metric].add(value)
+
+    return sketches
+
+
+def simulate_portfolio(loan_amounts,
+                       loan_terms_months,
+                       arm,
+                       simulation=None,
+                       model=None):
+    """
+    Runs the Monte Carlo simulation across a process pool.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        loan_terms_months (iterable): The loan terms in months.
+        arm (dict): ARM terms shared by the portfolio.
+        simulation (dict, optional): Overrides for DEFAULT_SIMULATION.
+        model (dict, optional): Overrides for DEFAULT_MODEL.
+
+    Returns:
+        dict: A summary of the distribution of each metric.
+    """
+    simulation = {**DEFAULT_SIMULATION, **(simulation or {})}
+    model = model or {}
+    term_principal = principal_by_term(loan_amounts, loan_terms_months)
+    block_count = math.ceil(simulation['paths'] / simulation['block_size'])
+    sketches = {metric: QuantileSketch() for metric in METRICS}
+
+    with ProcessPoolExecutor(simulation['workers']) as executor:
+        blocks = executor.map(simulate_block,
+                              [term_principal] * block_count,
+                              [arm] * block_count,
+                              [model] * block_count,
+                              [simulation] * block_count,
+                              range(block_count))
+        for block_sketches in blocks:
+            for metric, sketch in block_sketches.items():
+                sketches[metric].merge(sketch)
+
+    return {metric: sketch.summary() for metric, sketch in sketches.items()}
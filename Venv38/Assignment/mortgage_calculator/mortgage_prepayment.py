@@ -0,0 +1,146 @@
+"""
+Mortgage Prepayment Simulator
+
+Simulates paying a loan off early with recurring extra principal, one-off
+lump sums, or both. After a lump sum the loan can optionally be recast:
+the regular payment is recalculated over the months that remain, instead
+of keeping the payment and shortening the term.
+
+A scenario is a dictionary with these keys (see DEFAULT_PREPAYMENT):
+- 'extra_monthly': Extra principal paid every month.
+- 'lump_sums': Lump sums keyed by the month in which they are paid, after
+  that month's regular payment, or None.
+- 'recast': Whether to recalculate the regular payment over the remaining
+  term after each lump sum.
+
+Each scenario reports the new payoff month and the interest saved against
+the original schedule, whose total interest comes from the closed-form
+functions in mortgage_calculator.
+"""
+from itertools import repeat
+
+import mortgage_calculator as mc
+
+DEFAULT_PREPAYMENT = {
+    'extra_monthly': 0,
+    'lump_sums': None,
+    'recast': False,
+}
+
+
+def prepayment_schedule(loan_amount,
+                        apr,
+                        loan_term_months,
+                        prepayment=None):
+    """
+    Yields the amortization schedule of a loan with prepayments.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        prepayment (dict, optional): The scenario; missing keys come from
+        DEFAULT_PREPAYMENT.
+
+    Yields:
+        tuple: (month, payment, principal, interest, prepaid, balance),
+        where prepaid is the extra and lump-sum principal for the month.
+    """
+    prepayment = {**DEFAULT_PREPAYMENT, **(prepayment or {})}
+    balance = float(loan_amount)
+    rate = mc.monthly_rate(apr)
+    months = int(loan_term_months)
+    extra_monthly = float(prepayment['extra_monthly'])
+    lump_sums = prepayment['lump_sums'] or {}
+    payment = mc.payment_from_monthly_rate(balance, rate, months)
+
+    for month in range(1, months + 1):
+        interest = balance * rate
+        principal = min(payment - interest, balance)
+        if month == months:
+            principal = balance
+        balance -= principal
+
+        lump_sum = float(lump_sums.get(month, 0))
+        prepaid = min(extra_monthly + lump_sum, balance)
+        balance -= prepaid
+
+        yield (month, principal + interest, principal, interest, prepaid,
+               balance)
+
+        if balance <= 0:
+            return
+
+        if prepayment['recast'] and lump_sum:
+            payment = mc.payment_from_monthly_rate(balance, rate,
+                                                   months - month)
+
+
+def simulate_prepayment(loan_amount,
+                        apr,
+                        loan_term_months,
+                        prepayment=None):
+    """
+    Summarises one prepayment scenario against the original schedule.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+        prepayment (dict, optional): The scenario; missing keys come from
+        DEFAULT_PREPAYMENT.
+
+    Returns:
+        dict: The 'payoff_month', 'months_saved', 'interest_paid' and
+        'interest_saved' for the scenario.
+    """
+    payoff_month = 0
+    interest_paid = 0.0
+
+    for row in prepayment_schedule(loan_amount, apr, loan_term_months,
+                                   prepayment):
+        payoff_month = row[0]
+        interest_paid += row[3]
+
+    original_interest = mc.calculate_cumulative_interest(
+        loan_amount, apr, loan_term_months, loan_term_months)
+
+    return {
+        'payoff_month': payoff_month,
+        'months_saved': int(loan_term_months) - payoff_month,
+        'interest_paid': interest_paid,
+        'interest_saved': original_interest - interest_paid,
+    }
+
+
+def simulate_prepayments(loan_amounts,
+                         aprs,
+                         loan_terms_months,
+                         prepayment=None):
+    """
+    Summarises a prepayment offer for every loan in a batch.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+        prepayment (dict, optional): The scenario, shared by every loan;
+        missing keys come from DEFAULT_PREPAYMENT. 'extra_monthly' may
+        also be an iterable with one value per loan, and 'lump_sums' a
+        list with one dictionary per loan.
+
+    Returns:
+        list: One scenario summary per loan, in input order.
+    """
+    prepayment = {**DEFAULT_PREPAYMENT, **(prepayment or {})}
+    extra_monthly = prepayment['extra_monthly']
+    lump_sums = prepayment['lump_sums']
+    if isinstance(extra_monthly, (int, float)):
+        extra_monthly = repeat(extra_monthly)
+    if lump_sums is None or isinstance(lump_sums, dict):
+        lump_sums = repeat(lump_sums)
+
+    scenarios = ({**prepayment, 'extra_monthly': extra, 'lump_sums': sums}
+                 for extra, sums in zip(extra_monthly, lump_sums))
+    return list(map(simulate_prepayment, loan_amounts, aprs,
+                    loan_terms_months, scenarios))
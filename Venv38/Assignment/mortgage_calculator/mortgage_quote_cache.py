@@ -0,0 +1,242 @@
+"""
+Mortgage Quote Cache
+
+A persistent cache for mortgage quotes, so repeated (amount, APR, term)
+requests are answered from disk, including after a restart.
+
+Quotes are stored in SQLite under a SHA-256 hash of the normalized inputs.
+Entries expire after a time-to-live, and the least recently used entries
+are evicted once the cache grows past its size limit. The database runs
+in write-ahead-log mode with a busy timeout, so several processes can
+share one cache file safely.
+
+To keep writes cheap as the cache grows, both columns eviction sorts on
+are indexed, and eviction runs once every EVICT_BATCH changes rather than
+on every put, so the cache can briefly hold up to that many extra
+entries. Cache hits do not write: their access times are buffered and
+written TOUCH_BATCH at a time, or at the next put or close.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+
+import mortgage_calculator as mc
+
+DEFAULT_CACHE_PATH = 'mortgage_quotes.sqlite3'
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 100000
+BUSY_TIMEOUT_SECONDS = 30
+EVICT_BATCH = 256
+TOUCH_BATCH = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quotes_created ON quotes (created);
+CREATE INDEX IF NOT EXISTS quotes_accessed ON quotes (accessed);
+"""
+
+
+def quote_key(kind, loan_amount, apr, loan_term_months):
+    """
+    Builds the content-hash key for a quote.
+
+    The inputs are normalized first, so '5', 5 and 5.0 share a key.
+
+    Args:
+        kind (str): The kind of quote, e.g. 'payment' or 'schedule'.
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        str: The hex digest identifying the quote.
+    """
+    normalized = json.dumps([kind, float(loan_amount), float(apr),
+                             int(loan_term_months)])
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class QuoteCache:
+    """
+    A SQLite-backed quote cache with TTL and size-based eviction.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+        ttl_seconds (float): How long an entry stays valid.
+        max_entries (int): The most entries kept after eviction.
+        hits (int): Lookups answered from this process's cache reads.
+        misses (int): Lookups that had to compute the quote.
+        touched (dict): Access times of cache hits not yet written,
+        keyed by quote key.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH,
+                 ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.touched = {}
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def get(self, key):
+        """
+        Looks up a cached value, ignoring it if it has expired.
+
+        Args:
+            key (str): The quote key.
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        now = time.time()
+        row = self.connection.execute(
+            'SELECT value FROM quotes WHERE key = ? AND created > ?',
+            (key, now - self.ttl_seconds)).fetchone()
+        if row is None:
+            return None
+
+        self.touched[key] = now
+        if len(self.touched) >= TOUCH_BATCH:
+            with self.connection:
+                self.write_touches()
+        return json.loads(row[0])
+
+    def write_touches(self):
+        """
+        Writes the buffered access times of cache hits.
+
+        Call this inside a transaction.
+        """
+        if self.touched:
+            self.connection.executemany(
+                'UPDATE quotes SET accessed = ? WHERE key = ?',
+                [(accessed, key) for key, accessed in self.touched.items()])
+            self.touched.clear()
+
+    def put(self, key, value):
+        """
+        Stores a value, and evicts expired and excess entries once every
+        EVICT_BATCH changes made through this connection.
+
+        Args:
+            key (str): The quote key.
+            value: A JSON-serializable value to store.
+        """
+        now = time.time()
+        changes = self.connection.total_changes
+        with self.connection:
+            self.write_touches()
+            self.connection.execute(
+                'INSERT OR REPLACE INTO quotes VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now, now))
+            if (self.connection.total_changes // EVICT_BATCH
+                    != changes // EVICT_BATCH):
+                self.evict(now)
+
+    def evict(self, now):
+        """
+        Removes expired entries and trims the cache to max_entries.
+
+        Args:
+            now (float): The current time, as from time.time().
+        """
+        self.connection.execute('DELETE FROM quotes WHERE created <= ?',
+                                (now - self.ttl_seconds,))
+        size = self.connection.execute(
+            'SELECT COUNT(*) FROM quotes').fetchone()[0]
+        if size > self.max_entries:
+            self.connection.execute(
+                'DELETE FROM quotes WHERE key IN ('
+                'SELECT key FROM quotes ORDER BY accessed LIMIT ?)',
+                (size - self.max_entries,))
+
+    def cached(self, key, compute):
+        """
+        Returns the cached value for a key, computing and storing it on a
+        miss.
+
+        Args:
+            key (str): The quote key.
+            compute (callable): Called with no arguments on a miss.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def stats(self):
+        """
+        Reports this process's hit and miss counts and the cache size.
+
+        Returns:
+            dict: The 'hits', 'misses' and 'size' of the cache.
+        """
+        size = self.connection.execute(
+            'SELECT COUNT(*) FROM quotes').fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'size': size}
+
+    def close(self):
+        """
+        Writes any buffered access times and closes the database
+        connection.
+        """
+        with self.connection:
+            self.write_touches()
+        self.connection.close()
+
+
+def cached_monthly_payment(cache, loan_amount, apr, loan_term_months):
+    """
+    Calculates a monthly payment through the quote cache.
+
+    Args:
+        cache (QuoteCache): The cache to use.
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        float: The monthly payment amount.
+    """
+    key = quote_key('payment', loan_amount, apr, loan_term_months)
+    return cache.cached(key, lambda: mc.calculate_monthly_payment(
+        loan_amount, apr, loan_term_months))
+
+
+def cached_amortization_schedule(cache, loan_amount, apr, loan_term_months):
+    """
+    Builds an amortization schedule through the quote cache.
+
+    Args:
+        cache (QuoteCache): The cache to use.
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        list: [month, payment, principal, interest, balance] rows.
+    """
+    key = quote_key('schedule', loan_amount, apr, loan_term_months)
+    return cache.cached(key, lambda: [list(row) for row in
+                                      mc.amortization_schedule(
+                                          loan_amount, apr,
+                                          loan_term_months)])
@@ -0,0 +1,158 @@
+"""
+Mortgage Refinance Analyzer
+
+Works out whether refinancing a loan at an offered rate pays for itself.
+The loan's current balance comes from the closed-form balance function,
+and the new loan repays that balance at the offer's APR. By default the
+new loan runs over the months left on the old one.
+
+An offer is a dictionary with:
+- 'apr': The offered annual interest rate as a percentage.
+- 'fee': The up-front cost of refinancing.
+- 'term' (optional): The new loan's term in months. Defaults to the
+  months remaining on the current loan.
+
+For each loan and offer the analyzer reports:
+- 'monthly_savings': Current payment minus the new payment.
+- 'break_even_month': The first month after refinancing in which the
+  savings so far cover the fee, or NEVER if that does not happen while
+  both loans are being repaid.
+- 'net_savings': Total remaining payments on the current loan, minus
+  total payments on the new loan, minus the fee.
+"""
+import math
+from array import array
+
+import mortgage_calculator as mc
+
+NEVER = -1
+
+
+def break_even_month(fee, monthly_savings, months_available):
+    """
+    Finds the month in which monthly savings first cover a fee.
+
+    Args:
+        fee (float): The up-front cost.
+        monthly_savings (float): The saving each month.
+        months_available (int): The months over which savings accrue.
+
+    Returns:
+        int: The break-even month, or NEVER.
+    """
+    if fee <= 0:
+        return 0
+    if monthly_savings <= 0:
+        return NEVER
+
+    month = math.ceil(fee / monthly_savings)
+    return month if month <= months_available else NEVER
+
+
+def analyze_refinances(loan_amounts,
+                       aprs,
+                       loan_terms_months,
+                       payments_made,
+                       offers):
+    """
+    Evaluates a whole portfolio against several refinance offers.
+
+    Current payments and balances are worked out once for the portfolio
+    and shared by every offer. Each offer's new payments reuse the cached
+    annuity factor for its (rate, term) pair.
+
+    Args:
+        loan_amounts (iterable): The original loan amounts.
+        aprs (iterable): The current annual interest rates as percentages.
+        loan_terms_months (iterable): The original loan terms in months.
+        payments_made (int or iterable): Payments made so far, either one
+        count for every loan or one count per loan.
+        offers (list): The refinance offer dictionaries.
+
+    Returns:
+        list: One result per offer, in offer order. Each result holds
+        'monthly_savings', 'break_even_month' and 'net_savings' columns
+        as array.array values in loan order.
+    """
+    amounts, rates, terms = mc.loan_columns(loan_amounts, aprs,
+                                            loan_terms_months)
+    if isinstance(payments_made, int):
+        payments_made = [payments_made] * len(terms)
+    payments_made = array('l', (min(max(int(count), 0), term)
+                                for count, term in zip(payments_made, terms)))
+
+    current_payments = array('d', map(mc.payment_from_monthly_rate,
+                                      amounts, rates, terms))
+    balances = array('d', map(mc.balance_from_monthly_rate,
+                              amounts, rates, terms, payments_made))
+    remaining = array('l', (term - count
+                            for term, count in zip(terms, payments_made)))
+
+    return [refinance_offer(offer, current_payments, balances, remaining)
+            for offer in offers]
+
+
+def refinance_offer(offer, current_payments, balances, remaining):
+    """
+    Evaluates one offer against pre-computed portfolio columns.
+
+    Loans that are already paid off save nothing and never break even.
+
+    Args:
+        offer (dict): The refinance offer.
+        current_payments (array.array): Current monthly payments.
+        balances (array.array): Current balances.
+        remaining (array.array): Months left on each current loan.
+
+    Returns:
+        dict: 'monthly_savings', 'break_even_month' and 'net_savings'
+        columns, in loan order.
+    """
+    rate = mc.monthly_rate(offer['apr'])
+    fee = float(offer.get('fee', 0))
+    result = {
+        'monthly_savings': array('d'),
+        'break_even_month': array('l'),
+        'net_savings': array('d'),
+    }
+
+    for payment, balance, months_left in zip(current_payments, balances,
+                                             remaining):
+        if months_left == 0:
+            result['monthly_savings'].append(0.0)
+            result['break_even_month'].append(NEVER)
+            result['net_savings'].append(-fee)
+            continue
+
+        new_term = int(offer.get('term') or months_left)
+        new_payment = mc.payment_from_monthly_rate(balance, rate, new_term)
+        savings = payment - new_payment
+
+        result['monthly_savings'].append(savings)
+        result['break_even_month'].append(
+            break_even_month(fee, savings, min(months_left, new_term)))
+        result['net_savings'].append(
+            payment * months_left - new_payment * new_term - fee)
+
+    return result
+
+
+def analyze_refinance(loan_amount, apr, loan_term_months, payments_made,
+                      offer):
+    """
+    Evaluates one loan against one refinance offer.
+
+    Args:
+        loan_amount (float): The original loan amount.
+        apr (float): The current annual interest rate as a percentage.
+        loan_term_months (int): The original loan term in months.
+        payments_made (int): Payments made so far.
+        offer (dict): The refinance offer.
+
+    Returns:
+        dict: The loan's 'monthly_savings', 'break_even_month' and
+        'net_savings'.
+    """
+    result = analyze_refinances([loan_amount], [apr], [loan_term_months],
+                                int(payments_made), [offer])[0]
+    return {name: column[0] for name, column in result.items()}
@@ -0,0 +1,100 @@
+"""
+Mortgage Sensitivity Grid
+
+Prices loans across a grid of APR shocks and term options, for questions
+like "what happens to every payment if rates rise 50bp?".
+
+A payment is the loan amount times an annuity factor that depends only on
+the rate and the term. The grid is therefore built as an outer product:
+the factor table for each distinct APR is computed once over every
+(shock, term) pair, then scaled by each loan amount with that APR.
+"""
+from array import array
+
+import mortgage_calculator as mc
+
+
+def annuity_factor_table(apr, apr_shocks, term_options):
+    """
+    Builds the payment per unit of principal for every shock and term.
+
+    Shocked APRs below zero are floored at zero.
+
+    Args:
+        apr (float): The base annual interest rate as a percentage.
+        apr_shocks (list): APR shifts in percentage points (0.5 = +50bp).
+        term_options (list): Loan terms in months.
+
+    Returns:
+        list: One array.array per shock, holding one factor per term.
+    """
+    return [array('d', (mc.payment_from_monthly_rate(
+                            1.0, mc.monthly_rate(max(apr + shock, 0)), term)
+                        for term in term_options))
+            for shock in apr_shocks]
+
+
+def payment_grid(loan_amounts, aprs, apr_shocks, term_options):
+    """
+    Calculates monthly payments for a portfolio over a shock/term grid.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The base annual interest rates as percentages.
+        apr_shocks (iterable): APR shifts in percentage points.
+        term_options (iterable): Loan terms in months.
+
+    Returns:
+        list: For each loan, a list with one array.array per shock holding
+        the payment for each term option, i.e. grid[loan][shock][term].
+    """
+    apr_shocks = [float(shock) for shock in apr_shocks]
+    term_options = [int(term) for term in term_options]
+    factor_tables = {}
+    grid = []
+
+    for loan_amount, apr in zip(loan_amounts, aprs):
+        apr = float(apr)
+        if apr not in factor_tables:
+            factor_tables[apr] = annuity_factor_table(apr,
+                                                      apr_shocks,
+                                                      term_options)
+
+        loan_amount = float(loan_amount)
+        grid.append([array('d', (loan_amount * factor for factor in row))
+                     for row in factor_tables[apr]])
+
+    return grid
+
+
+def portfolio_payment_grid(loan_amounts, aprs, apr_shocks, term_options):
+    """
+    Totals the portfolio's monthly payments for each shock and term.
+
+    Args:
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The base annual interest rates as percentages.
+        apr_shocks (iterable): APR shifts in percentage points.
+        term_options (iterable): Loan terms in months.
+
+    Returns:
+        list: One array.array per shock holding the total payment for
+        each term option.
+    """
+    apr_shocks = [float(shock) for shock in apr_shocks]
+    term_options = [int(term) for term in term_options]
+    principal_by_apr = {}
+
+    for loan_amount, apr in zip(loan_amounts, aprs):
+        apr = float(apr)
+        principal_by_apr[apr] = (principal_by_apr.get(apr, 0.0)
+                                 + float(loan_amount))
+
+    totals = [array('d', [0.0] * len(term_options)) for _ in apr_shocks]
+    for apr, principal in principal_by_apr.items():
+        table = annuity_factor_table(apr, apr_shocks, term_options)
+        for total_row, factor_row in zip(totals, table):
+            for index, factor in enumerate(factor_row):
+                total_row[index] += principal * factor
+
+    return totals
@@ -0,0 +1,457 @@
+"""
+Mortgage Quoting Service
+
+A small local HTTP/JSON service for the mortgage calculator, so quotes can
+be requested without starting the console script for each one. It uses
+only asyncio from the standard library.
+
+Endpoints:
+- POST /payment: {"loans": [{loan_amount, apr, loan_term_months}, ...]}
+- POST /schedule: Same body. Schedules run in a bounded process pool.
+- POST /solve: {"solve": "apr" | "term" | "principal", "loans": [...]},
+  where each loan gives monthly_payment and the two known fields. A
+  target that cannot be reached has a null value.
+- GET /latency: Latency histograms for every endpoint.
+
+Every request may carry many loans, and a loan that fails validation or
+pricing gets an error in its slot instead of failing the whole request.
+A /schedule request builds at most MAX_SCHEDULE_ROWS rows; loans past that
+limit get 'error_too_many_rows'. Bodies over MAX_BODY_BYTES are refused
+with 413. Connections are kept alive between requests unless the client
+asks to close them.
+
+Usage:
+    python mortgage_service.py [--host HOST] [--port PORT] [--workers N]
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import mortgage_batch
+import mortgage_calculator as mc
+import mortgage_solvers
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 2
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_SCHEDULE_ROWS = 100000
+ENDPOINTS = ('/payment', '/schedule', '/solve', '/latency')
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+SOLVERS = {
+    'apr': (mortgage_solvers.solve_apr,
+            ('monthly_payment', 'loan_amount', 'loan_term_months')),
+    'term': (mortgage_solvers.solve_term,
+             ('monthly_payment', 'loan_amount', 'apr')),
+    'principal': (mortgage_solvers.solve_principal,
+                  ('monthly_payment', 'apr', 'loan_term_months')),
+}
+
+FIELD_RULES = dict(zip(mortgage_batch.LOAN_FIELDS,
+                       mortgage_batch.FIELD_RULES),
+                   monthly_payment=(float, False))
+
+
+class BadRequest(Exception):
+    """
+    Raised when a request body cannot be used.
+    """
+
+
+class PayloadTooLarge(Exception):
+    """
+    Raised when a request body is longer than MAX_BODY_BYTES.
+    """
+
+
+class LatencyHistogram:
+    """
+    Counts request latencies in fixed millisecond buckets per endpoint.
+
+    Attributes:
+        counts (dict): Bucket counts keyed by endpoint; the last bucket
+        counts requests slower than every bound.
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def record(self, endpoint, seconds):
+        """
+        Records one request's latency.
+
+        Args:
+            endpoint (str): The request path.
+            seconds (float): How long the request took.
+        """
+        counts = self.counts.setdefault(
+            endpoint, [0] * (len(LATENCY_BUCKETS_MS) + 1))
+        milliseconds = seconds * 1000
+        bucket = next((index for index, bound
+                       in enumerate(LATENCY_BUCKETS_MS)
+                       if milliseconds <= bound), len(LATENCY_BUCKETS_MS))
+        counts[bucket] += 1
+
+    def snapshot(self):
+        """
+        Reports the histograms in a JSON-friendly form.
+
+        Returns:
+            dict: For each endpoint, the request count and a mapping of
+            upper bound (in ms, or '+Inf') to count.
+        """
+        bounds = [str(bound) for bound in LATENCY_BUCKETS_MS] + ['+Inf']
+        return {endpoint: {'count': sum(counts),
+                           'buckets': dict(zip(bounds, counts))}
+                for endpoint, counts in self.counts.items()}
+
+
+def request_loans(body):
+    """
+    Extracts the list of loans from a request body.
+
+    Args:
+        body (dict): The decoded JSON body.
+
+    Returns:
+        list: The loan dictionaries.
+
+    Raises:
+        BadRequest: If the body has no list of loans.
+    """
+    loans = body.get('loans') if isinstance(body, dict) else None
+    if not isinstance(loans, list):
+        raise BadRequest('Body must be an object with a "loans" list.')
+    return loans
+
+
+def quote_payments(body):
+    """
+    Prices every loan in a request.
+
+    Args:
+        body (dict): The decoded JSON body.
+
+    Returns:
+        dict: {"results": [...]}, each with a monthly_payment or an error.
+    """
+    results = []
+    for loan in request_loans(body):
+        error = mortgage_batch.validate_loan(loan)
+        if error:
+            results.append({'error': error})
+            continue
+        try:
+            results.append({'monthly_payment': mc.calculate_monthly_payment(
+                loan['loan_amount'], loan['apr'], loan['loan_term_months'])})
+        except (ValueError, ArithmeticError):
+            results.append({'error': 'error_invalid'})
+    return {'results': results}
+
+
+def quote_schedules(loans):
+    """
+    Builds the amortization schedule of every loan in a request.
+
+    This runs in a worker process, so it takes and returns plain data.
+
+    Args:
+        loans (list): The loan dictionaries.
+
+    Returns:
+        dict: {"results": [...]}, each with a schedule or an error. Once
+        MAX_SCHEDULE_ROWS rows have been built, the remaining loans get
+        'error_too_many_rows'.
+    """
+    results = []
+    rows_left = MAX_SCHEDULE_ROWS
+    for loan in loans:
+        error = mortgage_batch.validate_loan(loan)
+        if not error and int(loan['loan_term_months']) > rows_left:
+            error = 'error_too_many_rows'
+        if error:
+            results.append({'error': error})
+            continue
+        try:
+            schedule = [list(row) for row in mc.amortization_schedule(
+                loan['loan_amount'], loan['apr'], loan['loan_term_months'])]
+        except (ValueError, ArithmeticError):
+            results.append({'error': 'error_invalid'})
+            continue
+        rows_left -= len(schedule)
+        results.append({'schedule': schedule})
+    return {'results': results}
+
+
+def quote_solutions(body):
+    """
+    Runs an inverse solver for every loan in a request.
+
+    Args:
+        body (dict): The decoded JSON body.
+
+    Returns:
+        dict: {"results": [...]}, each a solver result or an error.
+
+    Raises:
+        BadRequest: If the requested solver does not exist.
+    """
+    if body.get('solve') not in SOLVERS:
+        raise BadRequest('"solve" must be one of: ' + ', '.join(SOLVERS))
+
+    solver, fields = SOLVERS[body['solve']]
+    results = []
+    for loan in request_loans(body):
+        error = solver_input_error(loan, fields)
+        if error:
+            results.append({'error': error})
+            continue
+        try:
+            results.append(solver(*(loan[field] for field in fields)))
+        except (TypeError, ValueError, ArithmeticError):
+            results.append({'error': 'error_invalid'})
+    return {'results': results}
+
+
+def solver_input_error(loan, fields):
+    """
+    Validates the known fields of a solver request using the interactive
+    calculator's rules.
+
+    Args:
+        loan (dict): The loan record.
+        fields (tuple): The fields the solver takes.
+
+    Returns:
+        str: The MESSAGES key of the first error found, or None if every
+        field is valid.
+    """
+    for field in fields:
+        type_constructor, allow_zero = FIELD_RULES[field]
+        error = mc.input_error(mortgage_batch.loan_field(loan, field),
+                               type_constructor, allow_zero)
+        if error:
+            return error
+    return None
+
+
+class QuoteService:
+    """
+    Serves mortgage quotes over HTTP/1.1 with keep-alive.
+
+    Attributes:
+        executor (ProcessPoolExecutor): The bounded pool for schedules.
+        latency (LatencyHistogram): Per-endpoint request latencies.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.executor = ProcessPoolExecutor(workers)
+        self.latency = LatencyHistogram()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves requests on one connection until either side closes it.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's reader.
+            writer (asyncio.StreamWriter): The connection's writer.
+        """
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await read_request(reader)
+                except PayloadTooLarge:
+                    write_response(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                   {'error': 'Request body is too large.'},
+                                   False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = wants_keep_alive(headers)
+                start = time.perf_counter()
+                status, payload = await self.dispatch(method, path, body)
+                self.latency.record(path if path in ENDPOINTS else 'other',
+                                    time.perf_counter() - start)
+
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        """
+        Routes one request to its handler.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The request path.
+            body (bytes): The raw request body.
+
+        Returns:
+            tuple: (HTTPStatus, JSON-serializable payload).
+        """
+        if path == '/latency' and method == 'GET':
+            return HTTPStatus.OK, self.latency.snapshot()
+
+        handlers = {'/payment': quote_payments, '/solve': quote_solutions,
+                    '/schedule': None}
+        if path not in handlers:
+            return HTTPStatus.NOT_FOUND, {'error': 'Unknown endpoint.'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use POST.'}
+
+        try:
+            data = json.loads(body or b'{}')
+            if path == '/schedule':
+                loop = asyncio.get_running_loop()
+                payload = await loop.run_in_executor(
+                    self.executor, quote_schedules, request_loans(data))
+            else:
+                payload = handlers[path](data)
+        except (BadRequest, ValueError, AttributeError,
+                ArithmeticError) as error:
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+
+        return HTTPStatus.OK, payload
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Listens for connections until the task is cancelled.
+
+        Args:
+            host (str, optional): The interface to bind.
+            port (int, optional): The port to bind.
+        """
+        server = await asyncio.start_server(self.handle_connection,
+                                            host, port)
+        mc.prompt(mc.MESSAGES['service_listening'].format(host=host,
+                                                          port=port))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown()
+
+
+async def read_request(reader):
+    """
+    Reads one HTTP request from a connection.
+
+    Args:
+        reader (asyncio.StreamReader): The connection's reader.
+
+    Returns:
+        tuple: (method, path, headers, body), or None if the client
+        closed the connection.
+
+    Raises:
+        PayloadTooLarge: If the body is longer than MAX_BODY_BYTES. The
+        body is left unread, so the connection must be closed.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+
+    method, path, version = request_line.decode('latin-1').split(None, 2)
+    headers = {'version': version.strip()}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_BYTES:
+        raise PayloadTooLarge(length)
+
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path.split('?', 1)[0], headers, body
+
+
+def wants_keep_alive(headers):
+    """
+    Decides whether to keep a connection open after a request.
+
+    Args:
+        headers (dict): Lower-cased request headers plus 'version'.
+
+    Returns:
+        bool: True to keep the connection open.
+    """
+    connection = headers.get('connection', '').lower()
+    if headers['version'] == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+
+def json_safe(payload):
+    """
+    Replaces NaN and infinite floats in a payload with None.
+
+    The solvers report an unreachable target as NaN, which has no JSON
+    spelling, so it is sent as null instead.
+
+    Args:
+        payload: A JSON-serializable value.
+
+    Returns:
+        The payload with every non-finite float replaced by None.
+    """
+    if isinstance(payload, float):
+        return payload if math.isfinite(payload) else None
+    if isinstance(payload, dict):
+        return {key: json_safe(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [json_safe(value) for value in payload]
+    return payload
+
+
+def write_response(writer, status, payload, keep_alive):
+    """
+    Writes a JSON response to a connection.
+
+    Args:
+        writer (asyncio.StreamWriter): The connection's writer.
+        status (HTTPStatus): The response status.
+        payload: A JSON-serializable response body.
+        keep_alive (bool): Whether the connection stays open.
+    """
+    body = json.dumps(json_safe(payload), allow_nan=False).encode('utf-8')
+    head = (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            '\r\n')
+    writer.write(head.encode('latin-1') + body)
+
+
+def main():
+    """
+    Parses the command line and runs the service.
+    """
+    parser = argparse.ArgumentParser(description='Serve mortgage quotes.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(QuoteService(args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Mortgage Inverse Solvers
+
+Works the mortgage payment formula backwards: given a target monthly
+payment, find the APR, the loan term or the largest affordable loan amount.
+
+The principal and the term have closed-form answers. The APR does not, so
+it is found with Newton's method, falling back to bisection whenever a
+Newton step would leave the bracket known to contain the root. The rates
+probed along the way are one-offs, so they bypass the calculator's
+annuity-factor cache.
+
+Every solver returns a result dictionary so callers can check convergence:
+- 'value': The solved quantity, or NaN when no answer exists.
+- 'converged': Whether the answer meets the tolerance.
+- 'iterations': Iterations used (0 for closed-form solvers).
+- 'residual': Payment at the answer minus the target payment.
+"""
+import math
+from array import array
+from itertools import repeat
+from operator import mul, sub, truediv
+
+import mortgage_calculator as mc
+
+DEFAULT_TOLERANCE = 1e-9
+DEFAULT_MAX_ITERATIONS = 60
+MAX_MONTHLY_RATE = 1.0
+
+
+def solver_result(value, converged, iterations, residual):
+    """
+    Builds the result dictionary returned by every solver.
+
+    Args:
+        value (float): The solved quantity.
+        converged (bool): Whether the answer meets the tolerance.
+        iterations (int): Iterations used.
+        residual (float): Payment at the answer minus the target payment.
+
+    Returns:
+        dict: The solver result.
+    """
+    return {
+        'value': value,
+        'converged': converged,
+        'iterations': iterations,
+        'residual': residual,
+    }
+
+
+def no_solution():
+    """
+    Builds the result returned when the target payment is unreachable.
+
+    Returns:
+        dict: A non-converged solver result with a NaN value.
+    """
+    return solver_result(math.nan, False, 0, math.nan)
+
+
+def solve_principal(monthly_payment, apr, loan_term_months):
+    """
+    Finds the loan amount whose monthly payment equals the target.
+
+    Args:
+        monthly_payment (float): The target monthly payment.
+        apr (float): The annual interest rate as a percentage.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        dict: The solver result; 'value' is the affordable loan amount.
+    """
+    monthly_payment = float(monthly_payment)
+    unit_payment = mc.calculate_monthly_payment(1, apr, loan_term_months)
+    principal = monthly_payment / unit_payment
+    residual = (mc.calculate_monthly_payment(principal, apr, loan_term_months)
+                - monthly_payment)
+    return solver_result(principal, True, 0, residual)
+
+
+def solve_term(monthly_payment, loan_amount, apr):
+    """
+    Finds the number of months needed to repay a loan at the target payment.
+
+    The exact term is usually fractional, so 'value' is rounded up to the
+    next whole month; the final payment of that schedule is smaller.
+
+    Args:
+        monthly_payment (float): The target monthly payment.
+        loan_amount (float): The total amount of the loan.
+        apr (float): The annual interest rate as a percentage.
+
+    Returns:
+        dict: The solver result; 'value' is the term in whole months, or
+        NaN if the payment never covers the monthly interest.
+    """
+    monthly_payment = float(monthly_payment)
+    loan_amount = float(loan_amount)
+    rate = mc.monthly_rate(apr)
+
+    if monthly_payment <= loan_amount * rate or monthly_payment <= 0:
+        return no_solution()
+
+    if rate == 0:
+        exact_term = loan_amount / monthly_payment
+    else:
+        exact_term = (-math.log(1 - rate * loan_amount / monthly_payment)
+                      / math.log(1 + rate))
+
+    months = math.ceil(exact_term - DEFAULT_TOLERANCE)
+    residual = (mc.payment_from_monthly_rate(loan_amount, rate, months,
+                                             cached=False)
+                - monthly_payment)
+    return solver_result(months, True, 0, residual)
+
+
+def payment_slope(loan_amount, rate, loan_term_months):
+    """
+    Calculates the derivative of the monthly payment with respect to the
+    monthly rate.
+
+    Args:
+        loan_amount (float): The total amount of the loan.
+        rate (float): The monthly rate as a fraction. Must be positive.
+        loan_term_months (int): The length of the loan term in months.
+
+    Returns:
+        float: d(payment) / d(rate).
+    """
+    discount = (1 + rate) ** -loan_term_months
+    annuity = 1 - discount
+    return loan_amount * (
+        annuity - rate * loan_term_months * discount / (1 + rate)
+    ) / annuity ** 2
+
+
+def solve_apr(monthly_payment,
+              loan_amount,
+              loan_term_months,
+              tolerance=DEFAULT_TOLERANCE,
+              max_iterations=DEFAULT_MAX_ITERATIONS):
+    """
+    Finds the APR at which a loan's monthly payment equals the target.
+
+    Args:
+        monthly_payment (float): The target monthly payment.
+        loan_amount (float): The total amount of the loan.
+        loan_term_months (int): The length of the loan term in months.
+        tolerance (float, optional): Largest acceptable payment error.
+        max_iterations (int, optional): Iteration limit.
+
+    Returns:
+        dict: The solver result; 'value' is the APR as a percentage, or
+        NaN if the target is below the zero-rate payment or above the
+        payment at the maximum supported rate.
+    """
+    monthly_payment = float(monthly_payment)
+    loan_amount = float(loan_amount)
+    months = int(loan_term_months)
+
+    def residual_at(rate):
+        return (mc.payment_from_monthly_rate(loan_amount, rate, months,
+                                             cached=False)
+                - monthly_payment)
+
+    low, high = 0.0, MAX_MONTHLY_RATE
+    if residual_at(low) > tolerance or residual_at(high) < -tolerance:
+        return no_solution()
+
+    rate = monthly_payment / loan_amount
+    rate = min(max(rate, low), high)
+    residual = residual_at(rate)
+
+    for iteration in range(1, max_iterations + 1):
+        if abs(residual) <= tolerance:
+            return solver_result(rate * 1200, True, iteration - 1, residual)
+
+        if residual > 0:
+            high = rate
+        else:
+            low = rate
+
+        slope = payment_slope(loan_amount, rate, months) if rate else 0
+        step_ok = slope > 0 and low < rate - residual / slope < high
+        rate = rate - residual / slope if step_ok else (low + high) / 2
+        residual = residual_at(rate)
+
+    return solver_result(rate * 1200, abs(residual) <= tolerance,
+                         max_iterations, residual)
+
+
+def solve_principals(monthly_payments, aprs, loan_terms_months):
+    """
+    Finds the affordable loan amount for a batch of target payments.
+
+    Each distinct (rate, term) pair's annuity factor is computed once, and
+    the principals and residuals are worked out column-wise.
+
+    Args:
+        monthly_payments (iterable): The target monthly payments.
+        aprs (iterable): The annual interest rates as percentages.
+        loan_terms_months (iterable): The loan terms in months.
+
+    Returns:
+        list: One solver result per loan, in input order.
+    """
+    payments, rates, terms = mc.loan_columns(monthly_payments,
+                                             aprs,
+                                             loan_terms_months)
+    factors = array('d', mc.annuity_factors(rates, terms))
+    principals = array('d', map(truediv, payments, factors))
+    residuals = map(sub, map(mul, principals, factors), payments)
+    return list(map(solver_result, principals, repeat(True), repeat(0),
+                    residuals))
+
+
+def solve_terms(monthly_payments, loan_amounts, aprs):
+    """
+    Finds the term in whole months for a batch of target payments.
+
+    Args:
+        monthly_payments (iterable): The target monthly payments.
+        loan_amounts (iterable): The loan amounts.
+        aprs (iterable): The annual interest rates as percentages.
+
+    Returns:
+        list: One solver result per loan, in input order.
+    """
+    return list(map(solve_term, monthly_payments, loan_amounts, aprs))
+
+
+def solve_aprs(monthly_payments,
+               loan_amounts,
+               loan_terms_months,
+               tolerance=DEFAULT_TOLERANCE,
+               max_iterations=DEFAULT_MAX_ITERATIONS):
+    """
+    Finds the APR for a batch of target payments.
+
+    Args:
+        monthly_payments (iterable): The target monthly payments.
+        loan_amounts (iterable): The loan amounts.
+        loan_terms_months (iterable): The loan terms in months.
+        tolerance (float, optional): Largest acceptable payment error.
+        max_iterations (int, optional): Iteration limit per loan.
+
+    Returns:
+        list: One solver result per loan, in input order.
+    """
+    return list(map(solve_apr, monthly_payments, loan_amounts,
+                    loan_terms_months, repeat(tolerance),
+                    repeat(max_iterations)))